@@ -1,5 +1,6 @@
 # flake8: noqa
 
+import importlib
 
 # If you bork the build (e.g. by messing around with the templates),
 # you still want to be able to import femto so that you can
@@ -7,20 +8,53 @@
 # functions to the top level, but move on if not successful.
 try:
     from .sums import (sum00, sum01, p_sum01, sum02, p_sum02, sum03, p_sum03,
-                       sum04, p_sum04, sum10, sum11, sum12)
-except:
+                       sum04, p_sum04, sum10, sum11, sum12, sum13, p_sum13,
+                       cumsum, p_cumsum, move_sum, p_move_sum, move_mean,
+                       p_move_mean, sum_product, p_sum_product, weighted_sum,
+                       p_weighted_sum)
+except ImportError:
     pass
 
-try:
-    from femto.version import __version__
-    from femto.benchmark import *
-    from femto.util import get_functions
-except:
-    pass
+from femto.version import __version__
 
-try:
-    from numpy.testing import Tester
-    test = Tester().test
-    del Tester
-except (ImportError, ValueError):
-    print("No femto unit testing available.")
+# Everything but the kernels is imported on first use so that importing
+# femto costs little more than importing numpy. Name -> module it is in.
+_LAZY = {'bench': 'femto.benchmark',
+         'bench_axis0': 'femto.benchmark',
+         'bench_axis1': 'femto.benchmark',
+         'bench_overhead': 'femto.benchmark',
+         'bench_3d': 'femto.benchmark',
+         'bench_detailed': 'femto.benchmark',
+         'bench_numa': 'femto.benchmark',
+         'bench_aio': 'femto.benchmark',
+         'bench_import': 'femto.benchmark',
+         'perf': 'femto.counters',
+         'counters_available': 'femto.counters',
+         'get_functions': 'femto.util',
+         'autotune': 'femto.tune',
+         'sharded_sum': 'femto.shard',
+         'shared_array': 'femto.shard'}
+
+_SUBMODULES = ['aio', 'benchmark', 'counters', 'numa', 'shard', 'tune',
+               'util']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('femto.' + name)
+    elif name == 'test':
+        try:
+            from numpy.testing import Tester
+        except ImportError:
+            raise AttributeError("No femto unit testing available.")
+        value = Tester(importlib.import_module(__name__)).test
+    else:
+        raise AttributeError("module 'femto' has no attribute %r" % name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES) | {'test'})
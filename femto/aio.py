@@ -0,0 +1,112 @@
+"asyncio front end: awaitable femto functions that keep the event loop free"
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from femto import numa
+from femto.util import get_functions
+
+__all__ = ['configure', 'shutdown']
+
+# inputs smaller than this many bytes are reduced inline, in the event loop
+THRESHOLD = 1 << 20
+
+_state = {'threshold': THRESHOLD, 'workers': None, 'pool': None}
+_gate = threading.Lock()
+_lock = threading.Lock()
+
+
+def configure(threshold=None, workers=None):
+    """
+    Set the offload threshold and the number of cores the worker pool uses.
+
+    Parameters
+    ----------
+    threshold : {int, None}, optional
+        Inputs of at least this many bytes run on the worker pool; smaller
+        inputs run inline because handing them to a thread costs more than
+        reducing them. By default (None) the threshold is not changed.
+    workers : {int, None}, optional
+        Number of cores the pool may keep busy. A serial function holds one
+        core while it runs and a p_ function, whose OpenMP team fills the
+        machine, holds all of them, so the kernels never oversubscribe the
+        cores. By default (None) the number is not changed; initially it is
+        the number of cpus this process may run on.
+
+    """
+    if threshold is not None:
+        if threshold < 0:
+            raise ValueError("`threshold` must be non-negative")
+        _state['threshold'] = threshold
+    if workers is not None:
+        if workers < 1:
+            raise ValueError("`workers` must be at least 1")
+        shutdown()
+        _state['workers'] = workers
+
+
+def shutdown(wait=True):
+    "Shut down the worker pool; it is started again when next needed"
+    with _lock:
+        pool = _state['pool']
+        _state['pool'] = None
+    if pool is not None:
+        pool[0].shutdown(wait=wait)
+
+
+def get_pool():
+    "The worker pool, its core semaphore and its number of cores"
+    with _lock:
+        if _state['pool'] is None:
+            workers = _state['workers'] or len(numa.usable_cpus())
+            _state['pool'] = (ThreadPoolExecutor(workers),
+                              threading.Semaphore(workers), workers)
+        return _state['pool']
+
+
+def run(func, ncores, cores, args, kwds):
+    "Run func in a worker thread once `ncores` cores are free"
+    # the gate keeps serial calls from starving a waiting p_ call
+    with _gate:
+        for i in range(ncores):
+            cores.acquire()
+    try:
+        return func(*args, **kwds)
+    finally:
+        for i in range(ncores):
+            cores.release()
+
+
+def nbytes(a):
+    "Size of the input in bytes, zero if it is not an array or buffer"
+    try:
+        return a.nbytes
+    except AttributeError:
+        return 0
+
+
+def awaitable(func):
+    "Awaitable version of the femto function `func`"
+    parallel = func.__name__.startswith('p_')
+
+    async def wrapper(*args, **kwds):
+        if not args or nbytes(args[0]) < _state['threshold']:
+            return func(*args, **kwds)
+        executor, cores, workers = get_pool()
+        ncores = workers if parallel else 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, run, func, ncores, cores,
+                                          args, kwds)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__qualname__ = func.__name__
+    wrapper.__doc__ = ("Awaitable %s; see femto.%s for the arguments."
+                       % (func.__name__, func.__name__))
+    return wrapper
+
+
+for _func in get_functions():
+    globals()[_func.__name__] = awaitable(_func)
+    __all__.append(_func.__name__)
+del _func
@@ -0,0 +1,77 @@
+"Test asyncio front end."
+
+import asyncio
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import femto as ss
+from femto import aio
+
+
+def test_aio():
+    "test aio functions give the same output as the femto functions"
+    for threshold in (aio.THRESHOLD, 0):
+        for func in ss.get_functions():
+            yield unit_maker, func, threshold
+
+
+def unit_maker(func, threshold):
+    "Test that await aio.func gives the same output as func, run inline or not"
+    a = np.arange(60, dtype=np.float64).reshape(3, 4, 5) % 7
+    aio.configure(threshold=threshold)
+    try:
+        for axis in range(a.ndim):
+            args = get_args(func, a, axis)
+            actual = asyncio.run(getattr(aio, func.__name__)(*args))
+            desired = func(*args)
+            err_msg = "%s | axis %d | threshold %d" % (func.__name__, axis,
+                                                       threshold)
+            assert_array_equal(actual, desired, err_msg)
+    finally:
+        aio.configure(threshold=aio.THRESHOLD)
+
+
+def get_args(func, a, axis):
+    "Arguments of func for input `a` and axis"
+    name = func.__name__
+    if name in ss.get_functions(module_name='moves', as_string=True):
+        return a, 2, axis
+    if name in ('weighted_sum', 'p_weighted_sum'):
+        return a, np.arange(a.shape[axis], dtype=a.dtype), axis
+    if name in ('sum_product', 'p_sum_product'):
+        return a, a, axis
+    return a, axis
+
+
+def test_concurrent():
+    "test many concurrent serial and p_ calls on a small worker pool"
+
+    async def main(funcs, arrays):
+        calls = [getattr(aio, f.__name__)(a, 1) for f in funcs for a in arrays]
+        return await asyncio.gather(*calls)
+
+    funcs = (ss.get_functions(module_name='sums') +
+             ss.get_functions(module_name='cumsums'))
+    arrays = [np.random.RandomState(i).rand(20, 30) for i in range(4)]
+    aio.configure(threshold=0, workers=2)
+    try:
+        actual = asyncio.run(main(funcs, arrays))
+    finally:
+        aio.configure(threshold=aio.THRESHOLD)
+        aio.shutdown()
+        aio._state['workers'] = None
+    desired = [f(a, 1) for f in funcs for a in arrays]
+    for x, y in zip(actual, desired):
+        assert_array_equal(x, y)
+
+
+def test_errors():
+    "test aio.configure with bad input"
+    for kwargs in ({'threshold': -1}, {'workers': 0}):
+        try:
+            aio.configure(**kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("aio.configure accepted %s" % kwargs)
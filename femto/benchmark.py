@@ -1,38 +1,46 @@
 
+import os
+import sys
+import time
 import timeit
+import asyncio
+import subprocess
 import numpy as np
 import femto as ss
+from femto import numa
+from femto.util import func_dict
 
 __all__ = ['bench_axis0', 'bench_axis1', 'bench_overhead', 'bench',
-           'bench_3d', 'bench_detailed']
+           'bench_3d', 'bench_detailed', 'bench_numa', 'bench_aio',
+           'bench_import']
 
 
-def bench_axis0(functions=None):
+def bench_axis0(functions=None, counters=False):
     "Benchmark performance along axis 0"
     bench(shapes=[(1000, 1000), (1000, 1000), (1000, 1000), (1000, 1000)],
           dtypes=['float64', 'float32', 'int64', 'int32'],
-          axes=[0, 0, 0, 0], functions=functions)
+          axes=[0, 0, 0, 0], functions=functions, counters=counters)
 
 
-def bench_axis1(functions=None):
+def bench_axis1(functions=None, counters=False):
     "Benchmark performance along axis 1"
     bench(shapes=[(1000, 1000), (1000, 1000), (1000, 1000), (1000, 1000)],
           dtypes=['float64', 'float32', 'int64', 'int32'],
-          axes=[1, 1, 1, 1], functions=functions)
+          axes=[1, 1, 1, 1], functions=functions, counters=counters)
 
 
-def bench_overhead(functions=None):
+def bench_overhead(functions=None, counters=False):
     "Benchmark performance with small input arrays"
     bench(shapes=[(10, 10), (10, 10), (100, 100), (100, 100)],
           dtypes=['float64', 'float64', 'float64', 'float64'],
-          axes=[0, 1, 0, 1], functions=functions)
+          axes=[0, 1, 0, 1], functions=functions, counters=counters)
 
 
 def bench_3d(shapes=[(100, 100, 100), (100, 100, 100), (100, 100, 100)],
              dtypes=['float64', 'float64', 'float64'],
-             axes=[0, 1, 2], order='C', functions=None):
+             axes=[0, 1, 2], order='C', functions=None, counters=False):
     "Benchmark performance with 3d input arrays"
-    bench(shapes, dtypes, axes, order, functions)
+    bench(shapes, dtypes, axes, order, functions, counters)
 
 
 def bench(shapes=[(1, 1000), (1000, 1000), (1000, 1000), (1000, 1000),
@@ -40,7 +48,8 @@ def bench(shapes=[(1, 1000), (1000, 1000), (1000, 1000), (1000, 1000),
           dtypes=['float64', 'float64', 'int64', 'float64', 'int64'],
           axes=[1, 0, 0, 1, 1],
           order='C',
-          functions=None):
+          functions=None,
+          counters=False):
     """
     femto benchmark.
 
@@ -60,6 +69,14 @@ def bench(shapes=[(1, 1000), (1000, 1000), (1000, 1000), (1000, 1000),
         A list of strings specifying which functions to include in the
         benchmark. By default (None) all functions are included in the
         benchmark.
+    counters : bool, optional
+        If True, read hardware performance counters around each femto call
+        and add rows of instructions per cycle (ipc), last level cache
+        misses per byte of input (llc/B) and TLB misses per byte of input
+        (tlb/B) below each function. The counters only count the calling
+        thread, so the p_ functions, whose OpenMP threads outlive any one
+        call, get no rows. If the counters are not available, as is often
+        the case in containers, only time is reported. Default is False.
 
     Returns
     -------
@@ -77,28 +94,42 @@ def bench(shapes=[(1, 1000), (1000, 1000), (1000, 1000), (1000, 1000),
     print("    femto %s; Numpy %s" % (ss.__version__, np.__version__))
     print("    Speed is NumPy time divided by femto time")
     print("    Score is harmonic mean of speeds")
+    if counters:
+        if ss.counters_available():
+            print("    ipc, llc/B, tlb/B are femto hardware counts; none "
+                  "for p_ functions")
+        else:
+            print("    Hardware counters unavailable; timing only")
+            counters = False
     print('')
-    header = [" "*4]
+    suite = benchsuite(shapes, dtypes, axes, order, functions)
+    width = max([7] + [len(test["name"]) + 1 for test in suite])
     header = ["".join(str(shape).split(" ")).center(11) for shape in shapes]
-    header = [" "*6] + header
+    header = [" "*(width - 1)] + header
     print("".join(header))
     header = ["".join((str(dtype)).split(" ")).center(11)
               for dtype in dtypes]
-    header = [" "*6] + header
+    header = [" "*(width - 1)] + header
     print("".join(header))
     header = ["".join(("axis=" + str(axis)).split(" ")).center(11)
               for axis in axes]
     header.append("   score")
-    header = [" "*6] + header
+    header = [" "*(width - 1)] + header
     print("".join(header))
 
-    suite = benchsuite(shapes, dtypes, axes, order, functions)
     for test in suite:
-        name = test["name"].ljust(7)
+        name = test["name"].ljust(width)
         fmt = name + "%7.2f" + "%11.2f"*(len(shapes) - 1) + "%11.2f"
         speed = timer(test['statements'], test['setups'])
         speed.append(len(speed) / sum([1.0/s for s in speed]))
         print(fmt % tuple(speed))
+        if counters and test['name'] == serial(test['name']):
+            rows = counter(test['statements'][0], test['setups'],
+                           test['nbytes'])
+            fmt = "%s" + "%7s" + "%11s"*(len(shapes) - 1)
+            for label, row in rows:
+                row = ['-' if r is None else "%.4f" % r for r in row]
+                print(fmt % tuple([("  " + label).ljust(width)] + row))
 
 
 def timer(statements, setups):
@@ -113,6 +144,33 @@ def timer(statements, setups):
     return speed
 
 
+def counter(statement, setups, nbytes):
+    "Hardware counter rows (label, values) of `statement` for each setup"
+    ipc = []
+    llc = []
+    tlb = []
+    for setup, n in zip(setups, nbytes):
+        with np.errstate(invalid='ignore'):
+            p = countit(statement, setup)
+        ipc.append(p.ipc())
+        llc.append(p.per_byte('llc_misses', n * p.number))
+        tlb.append(p.per_byte('tlb_misses', n * p.number))
+    return [('ipc', ipc), ('llc/B', llc), ('tlb/B', tlb)]
+
+
+def countit(stmt, setup='pass', mintime=0.05):
+    "Count hardware events of `stmt`; returns femto.perf with `number` set"
+    number, time = autoscaler(timeit.Timer(stmt, setup), mintime)
+    namespace = {}
+    exec(setup, namespace)
+    code = compile(stmt, '<countit>', 'exec')
+    with ss.perf() as p:
+        for i in range(number):
+            exec(code, namespace)
+    p.number = number
+    return p
+
+
 def getarray(shape, dtype, order='C'):
     a = np.arange(np.prod(shape), dtype=dtype)
     rs = np.random.RandomState(shape)
@@ -120,6 +178,18 @@ def getarray(shape, dtype, order='C'):
     return np.array(a.reshape(*shape), order=order)
 
 
+# femto and NumPy statements compared for each group of femto functions; %s
+# is the name of the femto function without the p_ prefix
+STATEMENTS = {'sums': ("func(a, axis)", "a.sum(axis)"),
+              'cumsums': ("func(a, axis)", "np.cumsum(a, axis)"),
+              'moves': ("func(a, window, axis)",
+                        "numpy_%s(a, window, axis)"),
+              'products': ("func(a, b, axis)", "numpy_%s(a, b, axis)")}
+
+# moving window length used in the benchmarks
+WINDOW = 10
+
+
 def benchsuite(shapes, dtypes, axes, order, functions):
 
     suite = []
@@ -138,20 +208,84 @@ def benchsuite(shapes, dtypes, axes, order, functions):
         return setups
 
     # add functions to suite
-    funcs = ss.get_functions(as_string=True)
-    for func in funcs:
-        if functions is not None and func not in functions:
-            continue
-        run = {}
-        run['name'] = func
-        run['statements'] = ["func(a, axis)", "a.sum(axis)"]
-        setup = "from femto import %s as func" % func
-        run['setups'] = getsetups(setup, shapes, dtypes, axes, order)
-        suite.append(run)
+    for module_name, funcs in func_dict().items():
+        for func in funcs:
+            func = func.__name__
+            if functions is not None and func not in functions:
+                continue
+            statements = STATEMENTS[module_name]
+            run = {}
+            run['name'] = func
+            run['statements'] = [statements[0],
+                                 statements[1].replace('%s', serial(func))]
+            setup = """
+            import numpy as np
+            from femto.benchmark import (numpy_move_sum, numpy_move_mean,
+            numpy_sum_product, numpy_weighted_sum, getarray2)
+            from femto import %s as func
+            window = min(%d, a.shape[axis])
+            b = getarray2('%s', a, axis)"""
+            setup = setup % (func, WINDOW, func)
+            run['setups'] = getsetups(setup, shapes, dtypes, axes, order)
+            run['nbytes'] = [int(np.prod(shape)) * np.dtype(dtype).itemsize
+                             for shape, dtype in zip(shapes, dtypes)]
+            suite.append(run)
 
     return suite
 
 
+def serial(name):
+    "Name of the single-threaded version of function `name`"
+    if name.startswith('p_'):
+        return name[2:]
+    return name
+
+
+def numpy_move_sum(a, window, axis=-1):
+    "Moving window sum skipping NaNs, as in femto with min_count=window"
+    return numpy_move(a, window, axis, mean=False)
+
+
+def numpy_move_mean(a, window, axis=-1):
+    "Moving window mean skipping NaNs, as in femto with min_count=window"
+    return numpy_move(a, window, axis, mean=True)
+
+
+def numpy_move(a, window, axis, mean):
+    "Difference of cumulative sums of the non-NaN values and of their count"
+    a = np.moveaxis(np.asarray(a), axis, 0)
+    dtype = np.float32 if a.dtype == np.float32 else np.float64
+    isnan = np.isnan(a)
+    y = np.cumsum(np.where(isnan, 0, a), 0, dtype=dtype)
+    count = np.cumsum(~isnan, 0)
+    y[window:] -= y[:-window].copy()
+    count[window:] -= count[:-window].copy()
+    if mean:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y /= count
+    y[count < window] = np.nan
+    return np.moveaxis(y, 0, axis)
+
+
+def getarray2(name, a, axis):
+    "Second input of function `name`: weights along axis or an array like a"
+    if 'weighted' in name:
+        return np.linspace(0, 1, a.shape[axis]).astype(a.dtype)
+    return a[::-1].copy(order='K')
+
+
+def numpy_sum_product(a, b, axis=-1):
+    "Sum of products with the temporary a * b"
+    return (a * b).sum(axis)
+
+
+def numpy_weighted_sum(a, w, axis=-1):
+    "Weighted sum with the temporary a * w; w is along axis"
+    shape = [1] * a.ndim
+    shape[axis] = -1
+    return (a * np.reshape(w, shape)).sum(axis)
+
+
 def autotimeit(stmt, setup='pass', repeat=3, mintime=0.2):
     timer = timeit.Timer(stmt, setup)
     number, time1 = autoscaler(timer, mintime)
@@ -171,6 +305,221 @@ def autoscaler(timer, mintime):
 
 # ---------------------------------------------------------------------------
 
+def bench_numa(shape=(10000, 2000), dtype='float64', axis=1,
+               function='p_sum04'):
+    """
+    Benchmark the memory bandwidth of a parallel function on each NUMA node.
+
+    For each node the OpenMP threads are pinned to the cpus of that node and
+    the input array is created (and so first touched) on that node. With more
+    than one node the bandwidth of all nodes in numa mode is reported too.
+    On a single node computer the one node is all cpus.
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        Shape of the input array.
+    dtype : str, optional
+        Data type of the input array.
+    axis : int, optional
+        Axis along which to reduce.
+    function : str, optional
+        Name of the femto function to benchmark.
+
+    Returns
+    -------
+    A benchmark report is printed to stdout.
+
+    """
+
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    print('femto numa benchmark')
+    print("    femto %s; Numpy %s" % (ss.__version__, np.__version__))
+    print("    %s of %s %s array along axis=%d"
+          % (function, str(shape), dtype, axis))
+    print("    Bandwidth is GB of input read per second")
+    print('')
+    print("    node      cpus      GB/s")
+
+    setup = """
+        from femto.benchmark import getarray
+        from femto import %s as func
+        a = getarray(%s, '%s')
+    """
+    setup = setup % (function, str(shape), dtype)
+    setup = '\n'.join([s.strip() for s in setup.split('\n')])
+    stmt = "func(a, %d)" % axis
+    cpus_by_node = numa.nodes()
+    for i, cpus in enumerate(cpus_by_node):
+        numa.pin(cpus)
+        try:
+            t = autotimeit(stmt, setup)
+        finally:
+            numa.unpin()
+        print("%8s%10d%10.2f" % (str(i), len(cpus), nbytes / t / 1e9))
+
+    if numa.enable(cpus_by_node):
+        setup += "\nb = a\na = femto.numa.empty(b.shape, b.dtype)\na[...] = b"
+        setup = "import femto.numa\n" + setup
+        try:
+            t = autotimeit(stmt, setup)
+        finally:
+            numa.disable()
+        ncpus = sum([len(cpus) for cpus in cpus_by_node])
+        print("%8s%10d%10.2f" % ('all', ncpus, nbytes / t / 1e9))
+
+
+def bench_aio(shape=(1250, 10000), dtype='float64', axis=1,
+              function='p_sum04', ncalls=10, interval=0.001):
+    """
+    Benchmark the responsiveness of an asyncio event loop under load.
+
+    A heartbeat coroutine sleeps for `interval` seconds over and over while
+    `ncalls` concurrent reductions of a large array are awaited. How late
+    each heartbeat wakes up is its lag. The reductions are run two ways:
+    blocking, by calling the femto function from a coroutine, and through
+    femto.aio, which offloads them to its worker pool.
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        Shape of the input array. The default is 100 MB of float64.
+    dtype : str, optional
+        Data type of the input array.
+    axis : int, optional
+        Axis along which to reduce.
+    function : str, optional
+        Name of the femto function to benchmark.
+    ncalls : int, optional
+        Number of concurrent calls.
+    interval : float, optional
+        Heartbeat interval in seconds.
+
+    Returns
+    -------
+    A benchmark report is printed to stdout.
+
+    """
+    from femto import aio
+
+    a = getarray(shape, dtype)
+    func = getattr(ss, function)
+
+    async def blocking(a, axis):
+        return func(a, axis)
+
+    print('femto aio benchmark')
+    print("    femto %s; Numpy %s" % (ss.__version__, np.__version__))
+    print("    %d concurrent calls of %s on %s %s array along axis=%d"
+          % (ncalls, function, str(shape), dtype, axis))
+    print("    Lag is how late a %g ms heartbeat wakes up" % (1e3 * interval))
+    print('')
+    print("         call      time (s)   max lag (ms)   mean lag (ms)")
+    for name, afunc in (('blocking', blocking),
+                        ('femto.aio', getattr(aio, function))):
+        total, lags = asyncio.run(heartbeat(afunc, a, axis, ncalls,
+                                            interval))
+        print("%13s%14.3f%15.2f%16.2f"
+              % (name, total, 1e3 * max(lags), 1e3 * np.mean(lags)))
+
+
+async def heartbeat(afunc, a, axis, ncalls, interval):
+    "Await ncalls of afunc(a, axis) while timing a heartbeat"
+    loop = asyncio.get_running_loop()
+    lags = []
+    done = []
+
+    async def beat():
+        while not done:
+            t = loop.time()
+            await asyncio.sleep(interval)
+            lags.append(loop.time() - t - interval)
+
+    beats = asyncio.ensure_future(beat())
+    await asyncio.sleep(interval)
+    t = time.perf_counter()
+    await asyncio.gather(*[afunc(a, axis) for i in range(ncalls)])
+    total = time.perf_counter() - t
+    done.append(True)
+    await beats
+    return total, lags
+
+
+def bench_import(repeat=5, nslowest=5):
+    """
+    Benchmark the time it takes to import femto.
+
+    numpy and then femto are imported in `repeat` fresh interpreters run
+    with ``python -X importtime`` and the fastest femto import is reported
+    along with the modules femto imports directly that took the longest.
+
+    Parameters
+    ----------
+    repeat : int, optional
+        Number of fresh interpreters to time.
+    nslowest : int, optional
+        Number of the slowest modules imported directly by femto to list.
+
+    Returns
+    -------
+    A benchmark report is printed to stdout.
+
+    """
+
+    best = None
+    for i in range(repeat):
+        times = importtime(['numpy', 'femto'])
+        if best is None or times['femto'][0] < best['femto'][0]:
+            best = times
+
+    print('femto import benchmark')
+    print("    femto %s; Numpy %s" % (ss.__version__, np.__version__))
+    print("    Fastest of %d imports in a fresh interpreter" % repeat)
+    print('')
+    print("    %-24s%10s" % ('import', 'ms'))
+    print("    %-24s%10.1f" % ('numpy', best['numpy'][0] / 1e3))
+    print("    %-24s%10.1f" % ('femto after numpy', best['femto'][0] / 1e3))
+    print('')
+    print("    slowest imports by femto")
+    children = sorted(best['femto'][1], key=lambda c: -c[1])
+    for name, t in children[:nslowest]:
+        print("    %-24s%10.1f" % (name, t / 1e3))
+
+
+def importtime(modules):
+    """
+    Import `modules`, in order, in a fresh interpreter with -X importtime.
+
+    Returns a dict keyed by module name of the cumulative import time in
+    microseconds and the list of (name, cumulative time) of the modules it
+    imports directly.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    cmd = [sys.executable, '-X', 'importtime', '-c',
+           'import ' + ', '.join(modules)]
+    err = subprocess.run(cmd, env=env, stderr=subprocess.PIPE,
+                         universal_newlines=True, check=True).stderr
+    times = {}
+    children = []
+    for line in err.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        # a module is listed after the modules it imports, which are
+        # indented by two more spaces
+        depth = (len(name) - len(name.lstrip())) // 2
+        cumulative = int(fields[1])
+        if depth == 0:
+            times[name.strip()] = (cumulative, children)
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), cumulative))
+    return times
+
+
 def bench_detailed(function='sum04'):
     """
     Benchmark a single function in detail or, optionally, all functions.
@@ -210,32 +559,55 @@ def bench_detailed(function='sum04'):
         print("%8.1f   %s   %s" % (speed, name[0].ljust(13), name[1]))
 
 
+# NumPy function compared to each group of femto functions
+NUMPY_DETAILED = {'sums': 'numpy.sum',
+                  'cumsums': 'numpy.cumsum',
+                  'moves': 'femto.benchmark.numpy_%s',
+                  'products': 'femto.benchmark.numpy_%s'}
+
+
 def benchsuite_detailed(function):
 
     # setup is called before each run of each function
     setup = """
         from femto import %s as ss_fn
-        from numpy import sum as sl_fn
+        from %s import %s as sl_fn
 
         from numpy.random import RandomState
         rand = RandomState(123).rand
 
         a = %s
+        from femto.benchmark import getarray2
+        b = [getarray2('%s', a, axis) for axis in range(a.ndim)]
     """
     setup = '\n'.join([s.strip() for s in setup.split('\n')])
 
     # create benchmark suite
     instructions = get_instructions()
     f = function
+    module_name = 'sums'
+    for name, funcs in func_dict().items():
+        if f in [func.__name__ for func in funcs]:
+            module_name = name
+    sl_fn = NUMPY_DETAILED[module_name].replace('%s', serial(f))
+    sl_fn = sl_fn.rsplit('.', 1)
     suite = []
     for instruction in instructions:
         array = instruction[0]
         signature = instruction[1]
         repeat = instruction[2]
+        if module_name == 'moves':
+            # (a, axis) -> (a, window, axis)
+            axis = signature[4:-1]
+            signature = "(a, min(%d, a.shape[%s]), %s)" % (WINDOW, axis, axis)
+        elif module_name == 'products':
+            # (a, axis) -> (a, b, axis)
+            axis = signature[4:-1]
+            signature = "(a, b[%s], %s)" % (axis, axis)
         run = {}
         run['name'] = [f + signature, array]
         run['statements'] = ["ss_fn" + signature, "sl_fn" + signature]
-        run['setup'] = setup % (f, array)
+        run['setup'] = setup % (f, sl_fn[0], sl_fn[1], array, f)
         run['repeat'] = repeat
         suite.append(run)
 
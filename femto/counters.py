@@ -0,0 +1,201 @@
+"Hardware performance counters read with Linux perf_event_open"
+
+import os
+import struct
+import ctypes
+import fcntl
+import platform
+
+__all__ = ['perf', 'counters_available']
+
+# perf_event_open syscall number by machine
+SYSCALLS = {'x86_64': 298, 'amd64': 298, 'i386': 336, 'i686': 336,
+            'aarch64': 241, 'arm64': 241, 'ppc64le': 319}
+
+# perf_event_attr.type
+PERF_TYPE_HARDWARE = 0
+PERF_TYPE_HW_CACHE = 3
+
+# perf_event_attr.config for PERF_TYPE_HW_CACHE
+PERF_COUNT_HW_CACHE_DTLB = 3
+PERF_COUNT_HW_CACHE_OP_READ = 0
+PERF_COUNT_HW_CACHE_RESULT_MISS = 1
+
+# perf_event_attr.read_format
+PERF_FORMAT_TOTAL_TIME_ENABLED = 1
+PERF_FORMAT_TOTAL_TIME_RUNNING = 2
+
+# perf_event_attr flag bits
+FLAG_DISABLED = 1 << 0
+FLAG_INHERIT = 1 << 1
+FLAG_EXCLUDE_KERNEL = 1 << 5
+FLAG_EXCLUDE_HV = 1 << 6
+
+# ioctl requests, _IO('$', n)
+PERF_EVENT_IOC_ENABLE = 0x2400
+PERF_EVENT_IOC_DISABLE = 0x2401
+PERF_EVENT_IOC_RESET = 0x2403
+
+EVENTS = {
+    'cycles': (PERF_TYPE_HARDWARE, 0),
+    'instructions': (PERF_TYPE_HARDWARE, 1),
+    'llc_misses': (PERF_TYPE_HARDWARE, 3),
+    'tlb_misses': (PERF_TYPE_HW_CACHE,
+                   PERF_COUNT_HW_CACHE_DTLB |
+                   (PERF_COUNT_HW_CACHE_OP_READ << 8) |
+                   (PERF_COUNT_HW_CACHE_RESULT_MISS << 16)),
+}
+
+DEFAULT_EVENTS = ('cycles', 'instructions', 'llc_misses', 'tlb_misses')
+
+
+class perf_event_attr(ctypes.Structure):
+    # PERF_ATTR_SIZE_VER0 layout (64 bytes) which every kernel accepts
+    _fields_ = [('type', ctypes.c_uint32),
+                ('size', ctypes.c_uint32),
+                ('config', ctypes.c_uint64),
+                ('sample_period', ctypes.c_uint64),
+                ('sample_type', ctypes.c_uint64),
+                ('read_format', ctypes.c_uint64),
+                ('flags', ctypes.c_uint64),
+                ('wakeup_events', ctypes.c_uint32),
+                ('bp_type', ctypes.c_uint32),
+                ('config1', ctypes.c_uint64)]
+
+
+class perf(object):
+    """
+    Context manager that counts hardware events in the enclosed block.
+
+    Parameters
+    ----------
+    events : tuple, optional
+        Names of the events to count. Choose from 'cycles',
+        'instructions', 'llc_misses' and 'tlb_misses'. All are counted by
+        default.
+
+    Notes
+    -----
+    Counting is done for the calling thread and for threads it creates
+    while counting. OpenMP worker threads that already exist when the block
+    is entered are not counted, so use single-threaded functions (or call a
+    parallel function once before counting) when the counts matter.
+
+    Events that cannot be opened, for example inside a container or when
+    /proc/sys/kernel/perf_event_paranoid forbids it, are skipped. If no
+    event can be opened then `available` is False and `counts` is empty.
+
+    Examples
+    --------
+    >>> a = np.random.rand(1000, 1000)
+    >>> with ss.perf() as p:
+    ...     ss.sum04(a, 0)
+    >>> p.counts['cycles']
+
+    """
+
+    def __init__(self, events=DEFAULT_EVENTS):
+        for event in events:
+            if event not in EVENTS:
+                raise ValueError("unknown event `%s`" % event)
+        self.events = tuple(events)
+        self.counts = {}
+        self.available = False
+        self._fds = []
+
+    def __enter__(self):
+        self.counts = {}
+        self._fds = []
+        for event in self.events:
+            fd = open_event(*EVENTS[event])
+            if fd is not None:
+                self._fds.append((event, fd))
+        self.available = len(self._fds) > 0
+        for event, fd in self._fds:
+            fcntl.ioctl(fd, PERF_EVENT_IOC_RESET, 0)
+        for event, fd in self._fds:
+            fcntl.ioctl(fd, PERF_EVENT_IOC_ENABLE, 0)
+        return self
+
+    def __exit__(self, *exc_info):
+        for event, fd in self._fds:
+            fcntl.ioctl(fd, PERF_EVENT_IOC_DISABLE, 0)
+        for event, fd in self._fds:
+            self.counts[event] = read_event(fd)
+            os.close(fd)
+        self._fds = []
+        return False
+
+    def ipc(self):
+        "Instructions per cycle; None if not counted"
+        if 'instructions' not in self.counts or 'cycles' not in self.counts:
+            return None
+        if self.counts['cycles'] == 0:
+            return None
+        return self.counts['instructions'] / float(self.counts['cycles'])
+
+    def per_byte(self, event, nbytes):
+        "Count of `event` divided by `nbytes`; None if not counted"
+        if event not in self.counts or nbytes == 0:
+            return None
+        return self.counts[event] / float(nbytes)
+
+
+def counters_available():
+    "True if the cycles counter can be opened by this process"
+    fd = open_event(*EVENTS['cycles'])
+    if fd is None:
+        return False
+    os.close(fd)
+    return True
+
+
+# ---------------------------------------------------------------------------
+
+def open_event(event_type, config):
+    "Open a disabled, user-space-only counter; None if not possible"
+    syscall = get_syscall()
+    if syscall is None:
+        return None
+    nr, libc = syscall
+    attr = perf_event_attr()
+    attr.type = event_type
+    attr.size = ctypes.sizeof(attr)
+    attr.config = config
+    attr.read_format = (PERF_FORMAT_TOTAL_TIME_ENABLED |
+                        PERF_FORMAT_TOTAL_TIME_RUNNING)
+    attr.flags = (FLAG_DISABLED | FLAG_INHERIT | FLAG_EXCLUDE_KERNEL |
+                  FLAG_EXCLUDE_HV)
+    fd = libc.syscall(nr, ctypes.byref(attr), 0, -1, -1, 0)
+    if fd < 0:
+        return None
+    return fd
+
+
+def read_event(fd):
+    "Read counter, scaled up if the kernel multiplexed it"
+    value, enabled, running = struct.unpack('QQQ', os.read(fd, 24))
+    if running == 0:
+        return 0
+    if running < enabled:
+        value = int(value * float(enabled) / running)
+    return value
+
+
+_SYSCALL = []
+
+
+def get_syscall():
+    "Returns (syscall number, libc) or None if not on a supported Linux"
+    if not _SYSCALL:
+        nr = SYSCALLS.get(platform.machine().lower())
+        if not platform.system() == 'Linux' or nr is None:
+            _SYSCALL.append(None)
+        else:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.syscall.restype = ctypes.c_long
+            libc.syscall.argtypes = [ctypes.c_long, ctypes.c_void_p,
+                                     ctypes.c_int, ctypes.c_int,
+                                     ctypes.c_int, ctypes.c_ulong]
+            _SYSCALL.append((nr, libc))
+    return _SYSCALL[0]
@@ -0,0 +1,35 @@
+"Test hardware performance counters."
+
+import numpy as np
+from numpy.testing import assert_equal
+
+import femto as ss
+
+
+def test_perf():
+    "test ss.perf degrades gracefully"
+    a = np.random.RandomState(0).rand(100, 100)
+    with ss.perf() as p:
+        ss.sum00(a, 0)
+    assert_equal(p.available, len(p.counts) > 0)
+    for event in p.counts:
+        assert p.counts[event] >= 0, "negative count"
+    ipc = p.ipc()
+    if 'cycles' in p.counts and 'instructions' in p.counts:
+        assert ipc is None or ipc > 0, "ipc must be positive"
+    else:
+        assert ipc is None, "ipc must be None without counters"
+    assert p.per_byte('llc_misses', 0) is None, "zero bytes must give None"
+
+
+def test_perf_events():
+    "test ss.perf event selection"
+    with ss.perf(events=('cycles',)) as p:
+        pass
+    assert set(p.counts).issubset(['cycles']), "unexpected event counted"
+    try:
+        ss.perf(events=('bogus',))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError not raised for unknown event")
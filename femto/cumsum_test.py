@@ -0,0 +1,100 @@
+"Test cumsum functions."
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+
+import femto as ss
+from femto.sums_test import arrays, array_order
+
+
+def test_cumsums():
+    "test cumsum functions"
+    for func in ss.get_functions(module_name='cumsums'):
+        yield unit_maker, func, arrays
+
+
+def unit_maker(func, arrays_func, decimal=5):
+    "Test that ss.cumsum gives the same output as np.cumsum."
+    fmt = '\nfunc %s | input %s (%s) | shape %s | axis %s | order %s\n'
+    fmt += '\nInput array:\n%s\n'
+    name = func.__name__
+    func0 = np.cumsum
+    for i, a in enumerate(arrays_func()):
+        if a.ndim < 2:
+            continue
+        axes = range(-1, a.ndim)
+        for axis in axes:
+            actual = func(a, axis=axis)
+            desired = func0(a, axis=axis)
+            tup = (name, 'a'+str(i), str(a.dtype), str(a.shape),
+                   str(axis), array_order(a), a)
+            err_msg = fmt % tup
+            assert_array_almost_equal(actual, desired, decimal, err_msg)
+            assert actual.dtype == a.dtype, err_msg
+
+
+def test_out():
+    "test cumsum functions with out"
+    for func in ss.get_functions(module_name='cumsums'):
+        a = np.arange(12.0).reshape(3, 4)
+        out = np.empty_like(a)
+        y = func(a, axis=0, out=out)
+        assert y is out, "%s did not return out" % func.__name__
+        assert_array_equal(out, np.cumsum(a, axis=0))
+        out = np.asfortranarray(np.empty_like(a))
+        func(a, axis=1, out=out)
+        assert_array_equal(out, np.cumsum(a, axis=1))
+
+
+def test_upcast():
+    "test cumsum functions upcast bool and small integers as np.cumsum does"
+    for func in ss.get_functions(module_name='cumsums'):
+        for dtype in ('bool', 'int8', 'int16', 'uint8'):
+            a = np.full((3, 4), 100).astype(dtype)
+            for axis in (0, 1):
+                desired = np.cumsum(a, axis)
+                err_msg = "%s | %s | axis %d" % (func.__name__, dtype, axis)
+                actual = func(a, axis)
+                assert_array_equal(actual, desired, err_msg)
+                assert actual.dtype == desired.dtype, err_msg
+                out = np.empty_like(desired)
+                assert func(a, axis, out=out) is out, err_msg
+                assert_array_equal(out, desired, err_msg)
+
+
+def test_two_pass():
+    "test p_cumsum on slices long enough to be scanned in two passes"
+    # four threads, so that each one scans a block, on any cpu we may use
+    ss.numa.pin(sorted(ss.numa.usable_cpus())[:1] * 4)
+    try:
+        for dtype in ('float64', 'float32', 'int64', 'int32'):
+            # small integers so that the sum is exact in any order
+            a = np.arange(300000, dtype=dtype) % 3
+            for b, axis in ((a.reshape(1, -1), 1), (a.reshape(2, -1).T, 0)):
+                assert_array_equal(ss.p_cumsum(b, axis), np.cumsum(b, axis))
+    finally:
+        ss.numa.unpin()
+
+
+def test_errors():
+    "test cumsum functions with bad input"
+    a = np.ones((2, 3))
+    for func in ss.get_functions(module_name='cumsums'):
+        for kwargs, err in (({'axis': None}, ValueError),
+                            ({'axis': 2}, ValueError),
+                            ({'out': np.empty((3, 2))}, ValueError),
+                            ({'out': np.empty((2, 3), 'float32')}, ValueError),
+                            ({'out': [0, 0, 0]}, TypeError)):
+            try:
+                func(a, **kwargs)
+            except err:
+                pass
+            else:
+                raise AssertionError("%s did not raise %s with %s"
+                                     % (func.__name__, err.__name__, kwargs))
+        try:
+            func(np.ones(3))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("%s accepted 1d input" % func.__name__)
@@ -0,0 +1,51 @@
+"Test that importing femto is cheap and everything else is imported on use."
+
+import os
+import sys
+import subprocess
+
+import femto as ss
+
+# modules that import femto must not import
+LAZY = ['femto.benchmark', 'femto.aio', 'femto.shard', 'femto.numa',
+        'femto.counters', 'femto.util', 'femto.tune', 'timeit', 'asyncio',
+        'multiprocessing', 'concurrent.futures', 'numpy.testing']
+
+
+def test_lazy_import():
+    "test import femto imports the kernels but not the other modules"
+    before = imported('numpy')
+    after = imported('numpy, femto')
+    new = after - before
+    assert 'femto.sums' in new, "femto did not import its kernels"
+    eager = sorted(new & set(LAZY))
+    assert not eager, "import femto imported %s" % ', '.join(eager)
+
+
+def test_lazy_attributes():
+    "test attributes of femto that are imported on first use"
+    assert ss.bench is ss.benchmark.bench, "femto.bench"
+    assert ss.autotune is ss.tune.autotune, "femto.autotune"
+    assert ss.sharded_sum is ss.shard.sharded_sum, "femto.sharded_sum"
+    sums = ss.get_functions(module_name='sums')
+    assert sums[0] is ss.sum00, "femto.get_functions"
+    assert ss.numa.__name__ == 'femto.numa', "femto.numa"
+    for name in ('bench_import', 'aio', 'perf', 'sum04'):
+        assert name in dir(ss), "%s not in dir(femto)" % name
+    try:
+        ss.no_such_attribute
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("femto.no_such_attribute did not raise")
+
+
+def imported(modules):
+    "Names of the modules loaded after `import modules` in a new interpreter"
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    code = "import sys, %s; print(' '.join(sys.modules))" % modules
+    out = subprocess.run([sys.executable, '-c', code], env=env,
+                         stdout=subprocess.PIPE, universal_newlines=True,
+                         check=True).stdout
+    return set(out.split())
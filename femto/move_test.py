@@ -0,0 +1,121 @@
+"Test moving window functions."
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+import femto as ss
+from femto.sums_test import array_order
+
+
+def test_move():
+    "test move functions"
+    for func in ss.get_functions(module_name='moves'):
+        yield unit_maker, func
+
+
+def unit_maker(func, decimal=5):
+    "Test that ss.move_xxx gives the same output as a slow version."
+    fmt = '\nfunc %s | window %d | min_count %s | input %s (%s) | shape %s '
+    fmt += '| axis %s | order %s\n'
+    fmt += '\nInput array:\n%s\n'
+    name = func.__name__
+    func0 = slow_move_mean if 'mean' in name else slow_move_sum
+    for i, a in enumerate(arrays()):
+        for axis in range(-1, a.ndim):
+            length = a.shape[axis]
+            windows = set(range(1, min(length, 3) + 1))
+            windows.update([length // 2, length])
+            windows.discard(0)
+            for window in sorted(windows):
+                for min_count in (None, (window + 1) // 2):
+                    actual = func(a, window, axis=axis, min_count=min_count)
+                    desired = func0(a, window, axis=axis, min_count=min_count)
+                    tup = (name, window, str(min_count), 'a'+str(i),
+                           str(a.dtype), str(a.shape), str(axis),
+                           array_order(a), a)
+                    err_msg = fmt % tup
+                    assert_array_almost_equal(actual, desired, decimal,
+                                              err_msg)
+                    assert actual.dtype == desired.dtype, err_msg
+
+
+def test_errors():
+    "test move functions with bad input"
+    a = np.ones((2, 3))
+    for func in ss.get_functions(module_name='moves'):
+        for args, kwargs in (((a, 0), {}),
+                             ((a, 4), {}),
+                             ((a, 2), {'axis': None}),
+                             ((a, 2), {'axis': 2}),
+                             ((a, 2), {'min_count': 0}),
+                             ((a, 2), {'min_count': 3}),
+                             ((np.ones(3), 2), {})):
+            try:
+                func(*args, **kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("%s did not raise ValueError with %s %s"
+                                     % (func.__name__, args[1:], kwargs))
+
+
+def arrays(dtypes=(np.float64, np.float32, np.int64, np.int32)):
+    "Iterator that yields arrays to use for unit testing."
+    rs = np.random.RandomState(0)
+    yield np.array([[1, 2, 3], [1, 2, 3]], dtype=np.float16)
+    for shape in ((2, 6), (3, 4), (2, 3, 4), (3, 300)):
+        for dtype in dtypes:
+            a = rs.randint(-9, 10, np.prod(shape)).astype(dtype)
+            if issubclass(a.dtype.type, np.inexact):
+                a[rs.rand(a.size) < 0.2] = np.nan
+                a /= 4
+            a = a.reshape(shape)
+            yield a
+            yield a.T
+    for dtype in dtypes:
+        a = np.arange(60).reshape(3, 4, 5).astype(dtype)
+        yield a[:, ::2]
+        yield a[:, :, 1::2]
+        yield np.transpose(a, (1, 2, 0))
+    a = np.arange(10, dtype=np.float64).reshape(2, 5)
+    yield a.astype(a.dtype.newbyteorder())
+    # infinities that enter and then leave the window
+    a = np.array([[1, np.inf, 2, 3, 4, 5, 6],
+                  [1, -np.inf, 2, np.inf, 3, np.nan, 4]])
+    for dtype in (np.float64, np.float32):
+        yield a.astype(dtype)
+        yield a.T.astype(dtype)
+    a = rs.randint(-9, 10, (3, 300)).astype(np.float64)
+    a[rs.rand(*a.shape) < 0.02] = np.inf
+    a[rs.rand(*a.shape) < 0.02] = -np.inf
+    a[rs.rand(*a.shape) < 0.05] = np.nan
+    yield a
+    yield a.T
+
+
+def slow_move_sum(a, window, axis=-1, min_count=None):
+    "Moving window sum that adds up each window"
+    return slow_move(a, window, axis, min_count, mean=False)
+
+
+def slow_move_mean(a, window, axis=-1, min_count=None):
+    "Moving window mean that averages each window"
+    return slow_move(a, window, axis, min_count, mean=True)
+
+
+def slow_move(a, window, axis, min_count, mean):
+    if min_count is None:
+        min_count = window
+    dtype = np.float32 if a.dtype == np.float32 else np.float64
+    a = np.moveaxis(a.astype(np.float64), axis, -1)
+    y = np.empty(a.shape)
+    for i in range(a.shape[-1]):
+        w = a[..., max(i - window + 1, 0):i + 1]
+        count = (~np.isnan(w)).sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s = np.nansum(w, axis=-1)
+            if mean:
+                s = s / count
+        s[count < min_count] = np.nan
+        y[..., i] = s
+    return np.moveaxis(y, -1, axis).astype(dtype)
@@ -0,0 +1,117 @@
+"NUMA mode: pinned threads and first touch by the owning thread"
+
+import os
+import glob
+
+import numpy as np
+from femto import sums
+
+__all__ = ['nodes', 'enable', 'disable', 'enabled', 'pin', 'unpin', 'empty']
+
+
+def nodes():
+    """
+    List of the cpus this process may run on, grouped by NUMA node.
+
+    Falls back to a single node holding all usable cpus when the kernel does
+    not describe NUMA nodes in /sys/devices/system/node.
+    """
+    allowed = usable_cpus()
+    paths = glob.glob('/sys/devices/system/node/node[0-9]*/cpulist')
+    paths.sort(key=lambda p: int(os.path.basename(os.path.dirname(p))[4:]))
+    groups = []
+    for path in paths:
+        with open(path) as f:
+            cpus = [c for c in parse_cpulist(f.read()) if c in allowed]
+        if cpus:
+            groups.append(cpus)
+    if not groups:
+        groups = [sorted(allowed)]
+    return groups
+
+
+def enable(cpus_by_node=None):
+    """
+    Switch numa mode on for the p_ functions.
+
+    The OpenMP threads are pinned to the cpus node by node so that the
+    static schedule gives each node a contiguous block of the slices along
+    the kept axes. Pointer tables and outputs are first touched by the
+    threads that use them, which places their pages on the owning node.
+
+    Parameters
+    ----------
+    cpus_by_node : {list, None}, optional
+        List of lists of cpus, one list per node. By default (None) the
+        nodes of this computer are used.
+
+    Returns
+    -------
+    enabled : bool
+        False, and nothing is changed, if there is only one node.
+
+    """
+    if cpus_by_node is None:
+        cpus_by_node = nodes()
+    if len(cpus_by_node) < 2:
+        return False
+    pin([cpu for cpus in cpus_by_node for cpu in cpus])
+    sums._numa_set(1)
+    return True
+
+
+def disable():
+    "Switch numa mode off and unpin the OpenMP threads"
+    sums._numa_set(0)
+    unpin()
+
+
+def enabled():
+    "True if numa mode is on"
+    return sums._numa_get()
+
+
+def pin(cpus):
+    "Use len(cpus) OpenMP threads and pin thread i to cpus[i]"
+    sums._numa_pin(list(cpus))
+
+
+def unpin():
+    "Restore the cpu affinity and number of OpenMP threads before pin()"
+    sums._numa_unpin()
+
+
+def empty(shape, dtype='float64'):
+    """
+    C contiguous array whose pages are first touched by the OpenMP threads.
+
+    Use it for large inputs of the p_ functions in numa mode so that each
+    thread reads memory on its own node. The values are zero.
+    """
+    a = np.empty(shape, dtype)
+    sums._numa_touch(a)
+    return a
+
+
+# ---------------------------------------------------------------------------
+
+def usable_cpus():
+    "Set of cpus this process may run on"
+    try:
+        return set(os.sched_getaffinity(0))
+    except AttributeError:
+        return set(range(os.cpu_count() or 1))
+
+
+def parse_cpulist(cpulist):
+    "Parse a cpulist such as '0-3,8-11' into a list of cpu numbers"
+    cpus = []
+    for part in cpulist.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
@@ -0,0 +1,53 @@
+"Test numa mode."
+
+import os
+
+import numpy as np
+from numpy.testing import assert_equal, assert_array_almost_equal
+
+import femto as ss
+from femto import numa
+from femto.sums_test import unit_maker, arrays
+
+PARALLEL = [ss.p_sum01, ss.p_sum02, ss.p_sum03, ss.p_sum04, ss.p_sum13]
+
+
+def test_nodes():
+    "test numa.nodes"
+    cpus_by_node = numa.nodes()
+    assert len(cpus_by_node) > 0, "no nodes found"
+    for cpus in cpus_by_node:
+        assert len(cpus) > 0, "empty node"
+    assert_equal(numa.parse_cpulist('0-2,5,7-8\n'), [0, 1, 2, 5, 7, 8])
+
+
+def test_single_node():
+    "test numa.enable is a no-op on a single node"
+    cpus = sorted(numa.usable_cpus())
+    assert not numa.enable([cpus]), "numa mode enabled on one node"
+    assert not numa.enabled(), "numa mode is on"
+
+
+def test_numa_mode():
+    "test p_ functions in numa mode"
+    # pretend the usable cpus are spread over two nodes
+    cpus = sorted(numa.usable_cpus())
+    fake_nodes = [cpus[:len(cpus) // 2] or cpus, cpus[len(cpus) // 2:]]
+    affinity = os.sched_getaffinity(0)
+    assert numa.enable(fake_nodes), "numa mode not enabled"
+    try:
+        assert numa.enabled(), "numa mode is off"
+        for func in PARALLEL:
+            unit_maker(func, arrays)
+    finally:
+        numa.disable()
+    assert not numa.enabled(), "numa mode is on"
+    assert_equal(os.sched_getaffinity(0), affinity)
+
+
+def test_empty():
+    "test numa.empty"
+    a = numa.empty((100, 7), 'float32')
+    assert_equal(a.dtype, np.float32)
+    assert_equal(a.shape, (100, 7))
+    assert_array_almost_equal(a, np.zeros((100, 7)))
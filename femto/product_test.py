@@ -0,0 +1,130 @@
+"Test sum_product and weighted_sum functions."
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_equal
+
+import femto as ss
+from femto.sums_test import arrays, array_order
+
+
+def test_sum_product():
+    "test sum_product functions"
+    for func in (ss.sum_product, ss.p_sum_product):
+        yield unit_maker, func, second_array, arrays
+
+
+def test_weighted_sum():
+    "test weighted_sum functions with weights along the reduced axis"
+    for func in (ss.weighted_sum, ss.p_weighted_sum):
+        yield unit_maker, func, weights, arrays
+
+
+def test_weighted_sum_output():
+    "test weighted_sum functions with weights of each output element"
+    for func in (ss.weighted_sum, ss.p_weighted_sum):
+        yield unit_maker, func, output_weights, arrays
+
+
+def test_weighted_sum_broadcast():
+    "test weighted_sum functions with output weights along one kept axis"
+    for func in (ss.weighted_sum, ss.p_weighted_sum):
+        yield unit_maker, func, first_kept_weights, arrays
+        yield unit_maker, func, last_kept_weights, arrays
+
+
+def unit_maker(func, second_func, arrays_func, decimal=5):
+    "Test that ss.func(a, b, axis) gives the same output as (a * b).sum."
+    fmt = '\nfunc %s | input %s (%s) | shape %s | axis %s | order %s\n'
+    fmt += '\nInput array:\n%s\n\nSecond input:\n%s\n'
+    name = func.__name__
+    for i, a in enumerate(arrays_func()):
+        if a.ndim < 2:
+            continue
+        for axis in range(-1, a.ndim):
+            b = second_func(a, axis)
+            actual = func(a, b, axis=axis)
+            with np.errstate(invalid='ignore'):
+                desired = (a * broadcast(a, b, axis)).sum(axis=axis,
+                                                          dtype=a.dtype)
+            tup = (name, 'a'+str(i), str(a.dtype), str(a.shape),
+                   str(axis), array_order(a), a, b)
+            err_msg = fmt % tup
+            assert_array_almost_equal(actual, desired, decimal, err_msg)
+            assert_equal(actual.dtype, desired.dtype, err_msg)
+
+
+def second_array(a, axis):
+    "Array like `a`, in the opposite memory order"
+    b = np.arange(a.size, dtype=a.dtype).reshape(a.shape) % 5
+    return np.asfortranarray(b) if a.flags.c_contiguous else b
+
+
+def weights(a, axis):
+    "One weight for each element along axis"
+    return (np.arange(a.shape[axis]) % 3).astype(a.dtype)
+
+
+def output_weights(a, axis):
+    "One weight for each element of the output"
+    shape = list(a.shape)
+    del shape[axis]
+    return (np.arange(np.prod(shape)) % 3).astype(a.dtype).reshape(shape)
+
+
+def first_kept_weights(a, axis):
+    "Weights along the first kept axis, of shape (n, 1, ..., 1)"
+    kept = [n for i, n in enumerate(a.shape) if i != axis % a.ndim]
+    shape = [kept[0]] + [1] * (len(kept) - 1)
+    return (np.arange(kept[0]) % 3).astype(a.dtype).reshape(shape)
+
+
+def last_kept_weights(a, axis):
+    "1d weights along the last kept axis"
+    kept = [n for i, n in enumerate(a.shape) if i != axis % a.ndim]
+    return (np.arange(kept[-1]) % 3).astype(a.dtype)
+
+
+def broadcast(a, b, axis):
+    "Broadcast second input to the shape of `a` as weighted_sum does"
+    if b.shape == a.shape:
+        return b
+    axis = axis % a.ndim
+    if b.ndim == 1 and b.shape[0] == a.shape[axis]:
+        shape = [1] * a.ndim
+        shape[axis] = -1
+        return b.reshape(shape)
+    shape = [n for i, n in enumerate(a.shape) if i != axis]
+    return np.expand_dims(np.broadcast_to(b, shape), axis)
+
+
+def test_mixed_dtypes():
+    "test sum_product with inputs of different dtypes"
+    a = np.arange(12, dtype=np.int32).reshape(3, 4)
+    b = np.ones((3, 4), dtype=np.float32)
+    for func in (ss.sum_product, ss.p_sum_product):
+        y = func(a, b, axis=0)
+        assert_equal(y.dtype, np.float64)
+        assert_array_almost_equal(y, (a * b).sum(axis=0))
+        y = func(a, b.astype(np.complex128), axis=1)
+        assert_array_almost_equal(y, (a * b).sum(axis=1))
+        y = func(a, b.astype('>f4'), axis=1)
+        assert_array_almost_equal(y, (a * b).sum(axis=1))
+
+
+def test_errors():
+    "test sum_product and weighted_sum functions with bad input"
+    a = np.ones((2, 3))
+    for func in ss.get_functions(module_name='products'):
+        for args, kwargs in (((a, np.ones((3, 2))), {}),
+                             ((a, np.ones(4)), {}),
+                             ((a, np.ones(5)), {'axis': 0}),
+                             ((a, a), {'axis': None}),
+                             ((a, a), {'axis': 2}),
+                             ((np.ones(3), np.ones(3)), {})):
+            try:
+                func(*args, **kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("%s did not raise ValueError"
+                                     % func.__name__)
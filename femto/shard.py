@@ -0,0 +1,237 @@
+"Sharded sums: worker processes reduce slabs of an array in shared memory"
+
+import atexit
+import multiprocessing
+import warnings
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+try:
+    from numpy.lib.array_utils import byte_bounds
+except ImportError:
+    from numpy import byte_bounds
+
+import femto
+from femto import numa
+
+__all__ = ['sharded_sum', 'shared_array', 'free', 'shutdown']
+
+# shared memory segments made by this process: name -> (segment, address)
+_registry = {}
+
+# the persistent worker pool and its number of processes
+_pool = {'pool': None, 'nprocs': 0}
+
+# unlinked segments that could not be closed while views of them were alive
+_unclosed = []
+
+# the segment a worker process has attached: name -> segment
+_attached = {}
+
+
+def shared_array(shape, dtype='float64'):
+    """
+    C contiguous array in shared memory.
+
+    sharded_sum reduces such an array (or any view of it) without copying
+    it. The values are zero. Release the memory with free once the array,
+    and every view of it, is no longer used.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    shm = SharedMemory(create=True, size=max(nbytes, 1))
+    a = np.ndarray(shape, dtype, buffer=shm.buf)
+    _registry[shm.name] = (shm, address(shm))
+    return a
+
+
+def free(a):
+    "Release the shared memory of an array made by shared_array"
+    name, offset = find(a)
+    if name is None:
+        raise ValueError("`a` is not in shared memory made by shared_array")
+    free_name(name)
+
+
+def sharded_sum(a, axis=-1, nprocs=None, function='sum04'):
+    """
+    Sum of array elements along given axis, reduced by worker processes.
+
+    The array is split into one slab per process along the longest kept
+    axis, so that each process makes its own part of the output, or, when
+    the kept axes are too short to give every process a slab, along the
+    reduced axis, in which case the partial sums are added. Each worker
+    reduces its slab in place in shared memory with a femto function.
+
+    Parameters
+    ----------
+    a : array_like
+        Input array. If it is not an array (or a view of one) made by
+        shared_array it is copied to shared memory first, with a warning:
+        make large inputs with shared_array to avoid the copy.
+    axis : int, optional
+        Axis along which the sum is computed. The default (axis=-1) is to
+        sum along the last axis.
+    nprocs : {int, None}, optional
+        Number of worker processes. The pool is kept between calls and only
+        grows. By default (None) there is one process per usable cpu.
+    function : str, optional
+        Name of the femto sum function each worker calls on its slab.
+
+    Returns
+    -------
+    y : ndarray
+        An array with the same shape as `a`, with the specified axis removed.
+
+    Notes
+    -----
+    The workers are started by a fork server, so, as with any
+    multiprocessing program, a script that calls sharded_sum must guard its
+    main code with ``if __name__ == '__main__':``.
+
+    """
+    a = np.asarray(a)
+    if function not in femto.get_functions(module_name='sums', as_string=True):
+        raise ValueError("`function` must be the name of a femto sum")
+    if a.ndim < 2:
+        raise ValueError("ndim must be > 1")
+    if axis < -a.ndim or axis >= a.ndim:
+        raise ValueError("axis(=%d) out of bounds" % axis)
+    axis = axis % a.ndim
+    if nprocs is None:
+        nprocs = len(numa.usable_cpus())
+    if nprocs < 1:
+        raise ValueError("`nprocs` must be at least 1")
+
+    kept = [i for i in range(a.ndim) if i != axis]
+    split = max(kept, key=lambda i: a.shape[i])
+    if a.shape[split] < nprocs and a.shape[axis] > a.shape[split]:
+        split = axis
+    nslabs = min(nprocs, a.shape[split])
+    if nslabs < 2 or a.size == 0:
+        return getattr(femto, function)(a, axis)
+
+    name, offset = find(a)
+    temp = name is None
+    if temp:
+        warnings.warn("sharded_sum copies `a` to shared memory because it "
+                      "was not made by femto.shared_array; make it with "
+                      "shared_array to avoid the copy", stacklevel=2)
+        b = shared_array(a.shape, a.dtype)
+        b[...] = a
+        a = b
+        name, offset = find(a)
+    try:
+        bounds = np.linspace(0, a.shape[split], nslabs + 1).astype(np.intp)
+        tasks = [(name, offset, a.shape, a.strides, a.dtype, axis, split,
+                  bounds[i], bounds[i + 1], function) for i in range(nslabs)]
+        partials = get_pool(nprocs).map(reduce_slab, tasks, chunksize=1)
+    finally:
+        if temp:
+            del a, b
+            free_name(name)
+
+    if split == axis:
+        y = partials[0]
+        for p in partials[1:]:
+            y += p
+        return y
+    return np.concatenate(partials, axis=split - (split > axis))
+
+
+def shutdown():
+    "Stop the worker pool; it is started again when next needed"
+    pool = _pool['pool']
+    _pool['pool'] = None
+    _pool['nprocs'] = 0
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+# ---------------------------------------------------------------------------
+
+def get_pool(nprocs):
+    "The persistent worker pool, grown to at least nprocs processes"
+    if _pool['nprocs'] < nprocs:
+        shutdown()
+        # workers start from a fresh process, not a fork of one whose OpenMP
+        # runtime may already be running threads
+        try:
+            ctx = multiprocessing.get_context('forkserver')
+        except ValueError:
+            ctx = multiprocessing.get_context()
+        _pool['pool'] = ctx.Pool(nprocs)
+        _pool['nprocs'] = nprocs
+    return _pool['pool']
+
+
+def reduce_slab(task):
+    "Reduce a slab of an array in shared memory; runs in a worker process"
+    name, offset, shape, strides, dtype, axis, split, start, stop, func = task
+    shm = attach(name)
+    a = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset,
+                   strides=strides)
+    index = [slice(None)] * len(shape)
+    index[split] = slice(start, stop)
+    return getattr(femto, func)(a[tuple(index)], axis)
+
+
+def attach(name):
+    "Attach the worker to a segment, detaching it from the previous one"
+    if name not in _attached:
+        for old in list(_attached):
+            _attached.pop(old).close()
+        try:
+            shm = SharedMemory(name, track=False)
+        except TypeError:
+            # before Python 3.13 attaching registers the segment with the
+            # resource tracker. The workers are started by the fork server,
+            # so they talk to the tracker of the parent, which registered
+            # the segment when it made it, and the tracker keeps the names
+            # in a set: the registration is a no-op and the one unregister
+            # done by the parent's unlink removes it. Unregistering here
+            # instead would remove the parent's registration, and its
+            # unlink would then make the tracker print a KeyError.
+            shm = SharedMemory(name)
+        _attached[name] = shm
+    return _attached[name]
+
+
+def address(shm):
+    "Address of the first byte of a shared memory segment"
+    return np.frombuffer(shm.buf, np.uint8, count=1).ctypes.data
+
+
+def find(a):
+    "Name of the segment holding array `a` and the offset of a[0, ..., 0]"
+    if not isinstance(a, np.ndarray):
+        return None, None
+    start = a.__array_interface__['data'][0]
+    for name, (shm, addr) in _registry.items():
+        if addr <= start < addr + shm.size:
+            lo, hi = byte_bounds(a)
+            if lo >= addr and hi <= addr + shm.size:
+                return name, start - addr
+    return None, None
+
+
+def free_name(name):
+    "Release a segment of the registry by name"
+    _unclosed.append(_registry.pop(name)[0])
+    _unclosed[-1].unlink()
+    for shm in list(_unclosed):
+        try:
+            shm.close()
+        except BufferError:
+            # views of the memory are alive; try again on the next free
+            continue
+        _unclosed.remove(shm)
+
+
+@atexit.register
+def cleanup():
+    "Stop the workers and unlink the segments left at exit"
+    shutdown()
+    for name in list(_registry):
+        free_name(name)
@@ -0,0 +1,102 @@
+"Test sharded sums."
+
+import warnings
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+
+import femto as ss
+from femto import shard
+
+
+def test_sharded_sum():
+    "test sharded_sum with arrays that are not in shared memory"
+    for nprocs in (1, 2, 3):
+        yield unit_maker, nprocs
+
+
+def unit_maker(nprocs, decimal=5):
+    "Test that ss.sharded_sum gives the same output as np.sum."
+    fmt = '\nnprocs %d | input %s (%s) | shape %s | axis %s\n'
+    for i, a in enumerate(arrays()):
+        for axis in range(-1, a.ndim):
+            with warnings.catch_warnings():
+                # the copy to shared memory is what is being tested
+                warnings.simplefilter('ignore')
+                actual = ss.sharded_sum(a, axis=axis, nprocs=nprocs)
+            desired = np.sum(a, axis=axis)
+            err_msg = fmt % (nprocs, 'a'+str(i), str(a.dtype), str(a.shape),
+                             str(axis))
+            assert_array_almost_equal(actual, desired, decimal, err_msg)
+
+
+def arrays(dtypes=('float64', 'float32', 'int64', 'int32')):
+    "A few arrays that cover each way sharded_sum splits its input"
+    rs = np.random.RandomState(0)
+    for dtype in dtypes:
+        a = rs.randint(-9, 10, (7, 50)).astype(dtype)
+        yield a                      # C order, split along a kept axis
+        yield a.T                    # F order
+        yield a[::-1, ::-2]          # reversed and strided
+        # fewer rows than nprocs: the reduced axis is split
+        yield a[:2]
+    a = rs.rand(3, 4, 5)
+    yield a
+    yield np.transpose(a, (2, 0, 1))
+
+
+def test_shared_array():
+    "test sharded_sum with views of an array in shared memory"
+    for dtype in ('float64', 'float32', 'int64', 'int32'):
+        a = ss.shared_array((6, 1000), dtype)
+        try:
+            a[...] = np.arange(a.size).reshape(a.shape) % 7
+            for b in (a, a.T, a[::2], a[:, ::-3], a[1:, 10:]):
+                assert shard.find(b)[0] is not None, "view not found"
+                for axis in range(b.ndim):
+                    actual = ss.sharded_sum(b, axis, nprocs=3)
+                    assert_array_equal(actual, b.sum(axis))
+            del b
+        finally:
+            shard.free(a)
+        del a
+    assert len(shard._registry) == 0, "shared memory was not released"
+
+
+def test_copy_warning():
+    "test sharded_sum warns when it copies its input to shared memory"
+    a = np.ones((4, 5))
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        ss.sharded_sum(a, 1, nprocs=2)
+        assert len(w) == 1, "no warning when copying `a`"
+        assert 'shared_array' in str(w[0].message), "warning does not say "\
+                                                    "to use shared_array"
+        b = ss.shared_array((4, 5))
+        try:
+            ss.sharded_sum(b, 1, nprocs=2)
+        finally:
+            shard.free(b)
+        assert len(w) == 1, "warning with an array in shared memory"
+
+
+def test_errors():
+    "test sharded_sum with bad input"
+    a = np.ones((2, 3))
+    for args, kwargs in (((np.ones(3),), {}),
+                         ((a,), {'axis': 2}),
+                         ((a,), {'nprocs': 0}),
+                         ((a,), {'function': 'cumsum'})):
+        try:
+            ss.sharded_sum(*args, **kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("sharded_sum did not raise ValueError with "
+                                 "%s" % kwargs)
+    try:
+        shard.free(a)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("free accepted an array not in shared memory")
@@ -180,3 +180,182 @@ init_iter2(iter2 *it, PyArrayObject *a, PyObject *y, int axis, int fast_axis)
 #define  YPP            *py++
 #define  YI(dtype)      *(npy_##dtype *)(it.py + it.i * it.ystride)
 #define  YX(dtype, x)   *(npy_##dtype *)(it.py + (x) * it.ystride)
+
+/* ----------------------------------------------------------------------- */
+
+/* Pointer tables for functions, such as cumsum, whose output y has the same
+ * shape as the input a. If axis is the fast axis then each entry points to
+ * the start of a slice along axis. Otherwise each entry points to the start
+ * of a plane spanned by axis and the fast axis. The tables make it easy to
+ * use the same code for single and multi-threaded (OpenMP) loops. */
+
+struct _piter3 {
+    Py_ssize_t length;       /* a.shape[axis] */
+    Py_ssize_t astride;      /* a.strides[axis] */
+    Py_ssize_t ystride;      /* y.strides[axis] */
+    Py_ssize_t fast_length;  /* a.shape[fast_axis]; 1 if fast_axis == axis */
+    Py_ssize_t fast_astride; /* a.strides[fast_axis] */
+    Py_ssize_t fast_ystride; /* y.strides[fast_axis] */
+    npy_intp   nits;         /* number of slices or planes */
+    char       **ppa;        /* start of each slice or plane of a */
+    char       **ppy;        /* start of each slice or plane of y */
+};
+typedef struct _piter3 piter3;
+
+/* returns 0 and sets a MemoryError if the tables cannot be allocated */
+static BN_INLINE int
+init_piter3(piter3 *it, PyArrayObject *a, PyArrayObject *y, int axis,
+            int fast_axis)
+{
+    int i;
+    npy_intp j;
+    const int ndim = PyArray_NDIM(a);
+    char *pa = PyArray_BYTES(a);
+    char *py = PyArray_BYTES(y);
+    const npy_intp *shape = PyArray_SHAPE(a);
+    const npy_intp *astrides = PyArray_STRIDES(a);
+    const npy_intp *ystrides = PyArray_STRIDES(y);
+    npy_intp indices[NPY_MAXDIMS];
+
+    it->length = shape[axis];
+    it->astride = astrides[axis];
+    it->ystride = ystrides[axis];
+    it->fast_length = 1;
+    it->fast_astride = 0;
+    it->fast_ystride = 0;
+    if (fast_axis != axis) {
+        it->fast_length = shape[fast_axis];
+        it->fast_astride = astrides[fast_axis];
+        it->fast_ystride = ystrides[fast_axis];
+    }
+    it->nits = 1;
+    for (i = 0; i < ndim; i++) {
+        indices[i] = 0;
+        if (i != axis && i != fast_axis) {
+            it->nits *= shape[i];
+        }
+    }
+
+    it->ppa = malloc(2 * (it->nits > 0 ? it->nits : 1) * sizeof(char*));
+    if (it->ppa == NULL) {
+        MEMORY_ERR("could not allocate pointer tables");
+        return 0;
+    }
+    it->ppy = &it->ppa[it->nits];
+    for (j = 0; j < it->nits; j++) {
+        it->ppa[j] = pa;
+        it->ppy[j] = py;
+        for (i = ndim - 1; i > -1; i--) {
+            if (i == axis || i == fast_axis) continue;
+            if (indices[i] < shape[i] - 1) {
+                pa += astrides[i];
+                py += ystrides[i];
+                indices[i]++;
+                break;
+            }
+            pa -= indices[i] * astrides[i];
+            py -= indices[i] * ystrides[i];
+            indices[i] = 0;
+        }
+    }
+    return 1;
+}
+
+/* Pointer tables for functions, such as sum_product, that read two inputs
+ * a and b of the same shape (b may be a view with zero strides) and reduce
+ * them along axis into y. The entries are slices or planes as in piter3. */
+
+struct _piter4 {
+    Py_ssize_t length;       /* a.shape[axis] */
+    Py_ssize_t astride;      /* a.strides[axis] */
+    Py_ssize_t bstride;      /* b.strides[axis] */
+    Py_ssize_t fast_length;  /* a.shape[fast_axis]; 1 if fast_axis == axis */
+    Py_ssize_t fast_astride; /* a.strides[fast_axis] */
+    Py_ssize_t fast_bstride; /* b.strides[fast_axis] */
+    Py_ssize_t fast_ystride; /* stride of y along fast_axis */
+    npy_intp   nits;         /* number of slices or planes */
+    char       **ppa;        /* start of each slice or plane of a */
+    char       **ppb;        /* start of each slice or plane of b */
+    char       **ppy;        /* start of each slice or plane of y */
+};
+typedef struct _piter4 piter4;
+
+/* returns 0 and sets a MemoryError if the tables cannot be allocated */
+static BN_INLINE int
+init_piter4(piter4 *it, PyArrayObject *a, PyArrayObject *b,
+            PyArrayObject *y, int axis, int fast_axis)
+{
+    int i;
+    npy_intp j;
+    const int ndim = PyArray_NDIM(a);
+    char *pa = PyArray_BYTES(a);
+    char *pb = PyArray_BYTES(b);
+    char *py = PyArray_BYTES(y);
+    const npy_intp *shape = PyArray_SHAPE(a);
+    const npy_intp *astrides = PyArray_STRIDES(a);
+    const npy_intp *bstrides = PyArray_STRIDES(b);
+    npy_intp ystrides[NPY_MAXDIMS];
+    npy_intp indices[NPY_MAXDIMS];
+
+    /* strides of y as if it had the shape of a */
+    for (i = 0; i < ndim; i++) {
+        if (i < axis) {
+            ystrides[i] = PyArray_STRIDE(y, i);
+        }
+        else if (i > axis) {
+            ystrides[i] = PyArray_STRIDE(y, i - 1);
+        }
+        else {
+            ystrides[i] = 0;
+        }
+    }
+
+    it->length = shape[axis];
+    it->astride = astrides[axis];
+    it->bstride = bstrides[axis];
+    it->fast_length = 1;
+    it->fast_astride = 0;
+    it->fast_bstride = 0;
+    it->fast_ystride = 0;
+    if (fast_axis != axis) {
+        it->fast_length = shape[fast_axis];
+        it->fast_astride = astrides[fast_axis];
+        it->fast_bstride = bstrides[fast_axis];
+        it->fast_ystride = ystrides[fast_axis];
+    }
+    it->nits = 1;
+    for (i = 0; i < ndim; i++) {
+        indices[i] = 0;
+        if (i != axis && i != fast_axis) {
+            it->nits *= shape[i];
+        }
+    }
+
+    it->ppa = malloc(3 * (it->nits > 0 ? it->nits : 1) * sizeof(char*));
+    if (it->ppa == NULL) {
+        MEMORY_ERR("could not allocate pointer tables");
+        return 0;
+    }
+    it->ppb = &it->ppa[it->nits];
+    it->ppy = &it->ppa[2 * it->nits];
+    for (j = 0; j < it->nits; j++) {
+        it->ppa[j] = pa;
+        it->ppb[j] = pb;
+        it->ppy[j] = py;
+        for (i = ndim - 1; i > -1; i--) {
+            if (i == axis || i == fast_axis) continue;
+            if (indices[i] < shape[i] - 1) {
+                pa += astrides[i];
+                pb += bstrides[i];
+                py += ystrides[i];
+                indices[i]++;
+                break;
+            }
+            pa -= indices[i] * astrides[i];
+            pb -= indices[i] * bstrides[i];
+            py -= indices[i] * ystrides[i];
+            indices[i] = 0;
+        }
+    }
+    return 1;
+}
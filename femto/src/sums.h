@@ -19,6 +19,7 @@
 
 #define NPY_NO_DEPRECATED_API NPY_1_11_API_VERSION
 #include <numpy/arrayobject.h>
+#include <numpy/npy_math.h>
 
 /* for ease of dtype templating */
 #define NPY_float64 NPY_FLOAT64
@@ -31,6 +32,9 @@
 #define NPY_MIN_int64 NPY_MIN_INT64
 #define NPY_MIN_int32 NPY_MIN_INT32
 
+#define BN_NAN NPY_NAN
+#define BN_INFINITY NPY_INFINITY
+
 #if PY_MAJOR_VERSION >= 3
     #define PyString_FromString PyBytes_FromString
     #define PyInt_FromLong PyLong_FromLong
@@ -145,12 +149,19 @@
     static PyObject * \
     name##_##dtype(PyArrayObject *a, int axis)
 
-#define REDUCE_MAIN(name) \
+/* the loop that follows is shared among the OpenMP threads if `threaded`
+ * is 1 and is run by the calling thread if it is 0 */
+#define OMP_FOR(threaded) OMP_FOR_##threaded
+#define OMP_FOR_0
+#define OMP_FOR_1 _Pragma("omp parallel for schedule(static)")
+
+#define REDUCE_MAIN(name, threaded) \
     static PyObject * \
     name(PyObject *self, PyObject *args, PyObject *kwds) \
     { \
         return reducer(args, \
                        kwds, \
+                       threaded, \
                        name##_float64, \
                        name##_float32, \
                        name##_int64, \
@@ -163,20 +174,61 @@ typedef PyObject *(*fnf_t)(PyArrayObject *a, int axis, int fast_axis);
 static PyObject *
 reducer(PyObject *args,
         PyObject *kwds,
+        int parallel,
         fone_t fone_float64,
         fone_t fone_float32,
         fone_t fone_int64,
         fone_t fone_int32);
 
+typedef int (*fcum_t)(PyArrayObject *a, PyArrayObject *y, int axis,
+                      int fast_axis);
+
+static PyObject *
+cumsummer(PyObject *args,
+          PyObject *kwds,
+          fcum_t f_float64,
+          fcum_t f_float32,
+          fcum_t f_int64,
+          fcum_t f_int32);
+
+typedef int (*fmove_t)(PyArrayObject *a, PyArrayObject *y, int axis,
+                       int fast_axis, npy_intp window, npy_intp min_count,
+                       int mean);
+
+static PyObject *
+mover(PyObject *args,
+      PyObject *kwds,
+      int mean,
+      fmove_t f_float64,
+      fmove_t f_float32,
+      fmove_t f_int64,
+      fmove_t f_int32);
+
+typedef PyObject *(*fsp_t)(PyArrayObject *a, PyArrayObject *b, int axis,
+                           int fast_axis);
+
+static PyObject *
+multiplier(PyObject *args,
+           PyObject *kwds,
+           int weighted,
+           fsp_t f_float64,
+           fsp_t f_float32,
+           fsp_t f_int64,
+           fsp_t f_int32);
+
 static PyObject *
 reducer02(PyObject *args,
           PyObject *kwds,
+          int parallel,
           fnf_t f_float64,
           fnf_t f_float32,
           fnf_t f_int64,
           fnf_t f_int32);
 
 
+#include <sched.h>
+#include <omp.h>
+
 #if defined(_MSC_VER)
      #include <immintrin.h>
 #elif defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
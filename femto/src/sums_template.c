@@ -26,17 +26,164 @@
 REDUCE(sum00, DTYPE0)
 {
     INIT(DTYPE0, DTYPE0)
+    Py_BEGIN_ALLOW_THREADS
     WHILE {
         npy_DTYPE0 asum = 0;
         FOR asum += AI(DTYPE0);
         YPP = asum;
         NEXT
     }
+    Py_END_ALLOW_THREADS
     return y;
 }
 /* dtype end */
 
-REDUCE_MAIN(sum00)
+REDUCE_MAIN(sum00, 0)
+
+/* numa ------------------------------------------------------------------ */
+
+/* In numa mode the OpenMP threads are pinned to cpus listed node by node so
+ * that the static schedule of the p_ functions hands each node a contiguous
+ * block of slices. The pointer tables and the output are then first touched
+ * by the threads that use them, so that their pages are placed on the node
+ * of the owning thread instead of the node of the master thread. Outside of
+ * numa mode nothing changes. */
+
+static int numa_on = 0;
+static int numa_pinned = 0;
+static int numa_nthreads = 0;
+static int numa_saved_nthreads = 0;
+static cpu_set_t numa_saved_mask;
+
+/* pointer to the start of slice `j` of `a` when iterating over all but axis */
+static BN_INLINE char *
+slice_start(PyArrayObject *a, int axis, npy_intp j)
+{
+    int i;
+    char *pa = PyArray_BYTES(a);
+    const npy_intp *shape = PyArray_SHAPE(a);
+    const npy_intp *strides = PyArray_STRIDES(a);
+    for (i = PyArray_NDIM(a) - 1; i > -1; i--) {
+        if (i == axis) continue;
+        pa += (j % shape[i]) * strides[i];
+        j /= shape[i];
+    }
+    return pa;
+}
+
+/* zero the contiguous array `y` one element per iteration with the static
+ * schedule used by the p_ functions, so that when element k is the output
+ * of iteration k of a kernel it is first touched by the thread that makes
+ * it */
+static void
+numa_first_touch(PyArrayObject *y)
+{
+    npy_intp k;
+    const npy_intp n = PyArray_SIZE(y);
+    const int itemsize = PyArray_ITEMSIZE(y);
+    char *p = PyArray_BYTES(y);
+    #pragma omp parallel for schedule(static)
+    for (k = 0; k < n; k++) {
+        memset(p + k * itemsize, 0, itemsize);
+    }
+}
+
+static PyObject *
+numa_pin(PyObject *self, PyObject *args)
+{
+    PyObject *cpus_obj;
+    int *cpus;
+    int i, n, nteam, failed = 0;
+    if (!PyArg_ParseTuple(args, "O", &cpus_obj)) return NULL;
+    cpus_obj = PySequence_Fast(cpus_obj, "`cpus` must be a sequence");
+    if (cpus_obj == NULL) return NULL;
+    n = (int)PySequence_Fast_GET_SIZE(cpus_obj);
+    if (n < 1) {
+        Py_DECREF(cpus_obj);
+        VALUE_ERR("`cpus` must not be empty");
+        return NULL;
+    }
+    cpus = malloc(n * sizeof(int));
+    if (cpus == NULL) {
+        Py_DECREF(cpus_obj);
+        return PyErr_NoMemory();
+    }
+    for (i = 0; i < n; i++) {
+        cpus[i] = PyInt_AsLong(PySequence_Fast_GET_ITEM(cpus_obj, i));
+        if (error_converting(cpus[i]) || cpus[i] < 0 ||
+            cpus[i] >= CPU_SETSIZE) {
+            free(cpus);
+            Py_DECREF(cpus_obj);
+            VALUE_ERR("`cpus` must be a sequence of cpu numbers");
+            return NULL;
+        }
+    }
+    Py_DECREF(cpus_obj);
+    if (!numa_pinned) {
+        sched_getaffinity(0, sizeof(cpu_set_t), &numa_saved_mask);
+        numa_saved_nthreads = omp_get_max_threads();
+    }
+    omp_set_num_threads(n);
+    nteam = n > numa_nthreads ? n : numa_nthreads;
+    #pragma omp parallel num_threads(nteam) reduction(|:failed)
+    {
+        int tid = omp_get_thread_num();
+        cpu_set_t mask;
+        CPU_ZERO(&mask);
+        CPU_SET(cpus[tid % n], &mask);
+        failed |= sched_setaffinity(0, sizeof(cpu_set_t), &mask) != 0;
+    }
+    free(cpus);
+    numa_pinned = 1;
+    numa_nthreads = nteam;
+    if (failed) {
+        RUNTIME_ERR("could not pin threads to `cpus`");
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+numa_unpin(PyObject *self, PyObject *args)
+{
+    if (numa_pinned) {
+        #pragma omp parallel num_threads(numa_nthreads)
+        {
+            sched_setaffinity(0, sizeof(cpu_set_t), &numa_saved_mask);
+        }
+        omp_set_num_threads(numa_saved_nthreads);
+        numa_pinned = 0;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+numa_set(PyObject *self, PyObject *args)
+{
+    int flag;
+    if (!PyArg_ParseTuple(args, "i", &flag)) return NULL;
+    numa_on = !!flag;
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+numa_get(PyObject *self, PyObject *args)
+{
+    return PyBool_FromLong(numa_on);
+}
+
+static PyObject *
+numa_touch(PyObject *self, PyObject *args)
+{
+    PyArrayObject *y;
+    if (!PyArg_ParseTuple(args, "O!", &PyArray_Type, &y)) return NULL;
+    if (!C_CONTIGUOUS(y) || !PyArray_ISWRITEABLE(y)) {
+        VALUE_ERR("array must be C contiguous and writeable");
+        return NULL;
+    }
+    numa_first_touch(y);
+    Py_RETURN_NONE;
+}
 
 /* sum01, p_sum01 -------------------------------------------------------- */
 
@@ -80,20 +227,32 @@ init_piter(piter *it, PyArrayObject *a, int axis, PyObject **y, int ydtype)
         }
     }
     it->ppa = malloc(it->nits * sizeof(char*));
-    for (j = 0; j < it->nits; j++) {
-        it->ppa[j] = pa;
-        for (i = ndim - 1; i > -1; i--) {
-            if (i == axis) continue;
-            if (indices[i] < shape[i] - 1) {
-                pa += strides[i];
-                indices[i]++;
-                break;
+    if (numa_on) {
+        npy_intp k;
+        #pragma omp parallel for schedule(static)
+        for (k = 0; k < it->nits; k++) {
+            it->ppa[k] = slice_start(a, axis, k);
+        }
+    }
+    else {
+        for (j = 0; j < it->nits; j++) {
+            it->ppa[j] = pa;
+            for (i = ndim - 1; i > -1; i--) {
+                if (i == axis) continue;
+                if (indices[i] < shape[i] - 1) {
+                    pa += strides[i];
+                    indices[i]++;
+                    break;
+                }
+                pa -= indices[i] * strides[i];
+                indices[i] = 0;
             }
-            pa -= indices[i] * strides[i];
-            indices[i] = 0;
         }
     }
     *y = PyArray_EMPTY(ndim - 1, yshape, ydtype, 0);
+    if (numa_on && *y != NULL) {
+        numa_first_touch((PyArrayObject *)*y);
+    }
 }
 
 #define P_INIT(dtype) \
@@ -112,12 +271,13 @@ init_piter(piter *it, PyArrayObject *a, int axis, PyObject **y, int ydtype)
     *(npy_##dtype *)(it.ppa[its] + (i) * it.astride)
 
 /* repeat = {'NAME': ['sum01', 'p_sum01'],
-             'PARALLEL': ['', '#pragma omp parallel for']} */
+             'THREADED': ['0', '1']} */
 /* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
 REDUCE(NAME, DTYPE0)
 {
     P_INIT(DTYPE0)
-    PARALLEL
+    Py_BEGIN_ALLOW_THREADS
+    OMP_FOR(THREADED)
     for (its = 0; its < it.nits; its++) {
         npy_intp i;
         npy_DTYPE0 s = 0;
@@ -126,11 +286,12 @@ REDUCE(NAME, DTYPE0)
         }
         py[its] = s;
     }
+    Py_END_ALLOW_THREADS
     P_RETURN
 }
 /* dtype end */
 
-REDUCE_MAIN(NAME)
+REDUCE_MAIN(NAME, THREADED)
 /* repeat end */
 
 /* sum02, p_sum02 -------------------------------------------------------- */
@@ -138,13 +299,14 @@ REDUCE_MAIN(NAME)
 /* loop unrolling (x4) of sum01 and p_sum01 */
 
 /* repeat = {'NAME': ['sum02', 'p_sum02'],
-             'PARALLEL': ['', '#pragma omp parallel for']} */
+             'THREADED': ['0', '1']} */
 /* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
 REDUCE(NAME, DTYPE0)
 {
     P_INIT(DTYPE0)
+    Py_BEGIN_ALLOW_THREADS
     if (it.length < 4) {
-        PARALLEL
+        OMP_FOR(THREADED)
         for (its = 0; its < it.nits; its++) {
             npy_intp i;
             npy_DTYPE0 s = 0;
@@ -156,7 +318,7 @@ REDUCE(NAME, DTYPE0)
     }
     else {
         Py_ssize_t i_unroll = it.length - it.length % 4;
-        PARALLEL
+        OMP_FOR(THREADED)
         for (its = 0; its < it.nits; its++) {
             Py_ssize_t i = 4;
             npy_DTYPE0 s[4];
@@ -176,11 +338,12 @@ REDUCE(NAME, DTYPE0)
             py[its] = s[0] + s[1] + s[2] + s[3];
         }
     }
+    Py_END_ALLOW_THREADS
     P_RETURN
 }
 /* dtype end */
 
-REDUCE_MAIN(NAME)
+REDUCE_MAIN(NAME, THREADED)
 /* repeat end */
 
 /* sum03, p_sum03 -------------------------------------------------------- */
@@ -204,7 +367,7 @@ typedef struct _piter2 piter2;
 
 static BN_INLINE void
 init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
-            int fast_axis)
+            int fast_axis, npy_intp ntile)
 {
     int i, j = 0;
     const int ndim = PyArray_NDIM(a);
@@ -227,8 +390,8 @@ init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
     it->nits = 1;
     it->nits4 = 1;
 
-    fast_nits4 = (it->fast_length - it->fast_length % N03) / N03;
-    fast_nits = it->fast_length - N03 * fast_nits4;
+    fast_nits4 = (it->fast_length - it->fast_length % ntile) / ntile;
+    fast_nits = it->fast_length - ntile * fast_nits4;
     for (i = 0; i < ndim; i++) {
         indices[i] = 0;
         if (i != axis) {
@@ -254,18 +417,56 @@ init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
     it->ppy = &it->ppa[it->nits];
 
     fast_axis = fast_axis < axis ? fast_axis : fast_axis - 1;
-    yshape[fast_axis] = N03 * fast_nits4;
     it->fast_ystride = ystrides[fast_axis];
+
+    if (numa_on) {
+        npy_intp k;
+        const int itemsize = PyArray_ITEMSIZE((PyArrayObject *)*y);
+        /* the outputs are not in iteration order, so each iteration first
+         * touches its own ones instead of calling numa_first_touch */
+        #pragma omp parallel for schedule(static)
+        for (k = 0; k < it->nits; k++) {
+            /* tiles of ntile columns come first, then the leftover columns */
+            const int tile = k < it->nits4;
+            npy_intp m = tile ? k : k - it->nits4;
+            char *qa = pa;
+            char *qy = py;
+            int d;
+            for (d = ndim - 2; d > -1; d--) {
+                npy_intp idx;
+                if (d == fast_axis) {
+                    npy_intp n = tile ? fast_nits4 : fast_nits;
+                    idx = m % n;
+                    m /= n;
+                    idx = tile ? ntile * idx : ntile * fast_nits4 + idx;
+                }
+                else {
+                    idx = m % yshape[d];
+                    m /= yshape[d];
+                }
+                qa += idx * astrides[d];
+                qy += idx * ystrides[d];
+            }
+            it->ppa[k] = qa;
+            it->ppy[k] = qy;
+            for (d = 0; d < (tile ? ntile : 1); d++) {
+                memset(qy + d * it->fast_ystride, 0, itemsize);
+            }
+        }
+        return;
+    }
+
+    yshape[fast_axis] = ntile * fast_nits4;
     j = 0;
     for (; j < it->nits4; j++) {
         it->ppa[j] = pa;
         it->ppy[j] = py;
         for (i = ndim - 2; i > -1; i--) {
             if (i == fast_axis) {
-                if (indices[i] < yshape[i] - N03) {
-                    indices[i] += N03;
-                    pa += N03 * astrides[i];
-                    py += N03 * ystrides[i];
+                if (indices[i] < yshape[i] - ntile) {
+                    indices[i] += ntile;
+                    pa += ntile * astrides[i];
+                    py += ntile * ystrides[i];
                     break;
                 }
             }
@@ -284,8 +485,8 @@ init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
     }
     yshape[fast_axis] = fast_nits;
     for (; j < it->nits; j++) {
-        it->ppa[j] = pa + N03 * fast_nits4 * astrides[fast_axis];
-        it->ppy[j] = py + N03 * fast_nits4 * ystrides[fast_axis];
+        it->ppa[j] = pa + ntile * fast_nits4 * astrides[fast_axis];
+        it->ppy[j] = py + ntile * fast_nits4 * ystrides[fast_axis];
         for (i = ndim - 2; i > -1; i--) {
             if (indices[i] < yshape[i] - 1) {
                 indices[i]++;
@@ -300,11 +501,13 @@ init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
     }
 }
 
-#define P_INIT2(dtype) \
+#define P_INIT2_TILE(dtype, ntile) \
     npy_intp its; \
     PyObject *y; \
     piter2 it; \
-    init_piter2(&it, a, axis, &y, NPY_##dtype, fast_axis); \
+    init_piter2(&it, a, axis, &y, NPY_##dtype, fast_axis, ntile); \
+
+#define P_INIT2(dtype) P_INIT2_TILE(dtype, N03)
 
 #define AP(dtype, p) \
     *(npy_##dtype *)(it.ppa[its] + i * it.astride + (p) * it.fast_stride)
@@ -313,15 +516,16 @@ init_piter2(piter2 *it, PyArrayObject *a, int axis, PyObject **y, int ydtype,
     *(npy_##dtype *)(it.ppy[its] + (p) * it.fast_ystride)
 
 /* repeat = {'NAME': ['sum03', 'p_sum03'],
-             'PARALLEL': ['', '#pragma omp parallel for']} */
+             'THREADED': ['0', '1']} */
 /* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
 static PyObject *
 NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
 {
     if (axis == fast_axis) {
         P_INIT(DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (it.length < 4) {
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 npy_intp i;
                 npy_DTYPE0 s = 0;
@@ -333,7 +537,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
         }
         else {
             Py_ssize_t i_unroll = it.length - it.length % 4;
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 Py_ssize_t i = 4;
                 npy_DTYPE0 s[4];
@@ -353,11 +557,13 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 py[its] = s[0] + s[1] + s[2] + s[3];
             }
         }
+        Py_END_ALLOW_THREADS
         return y;
     }
     else {
         P_INIT2(DTYPE0)
-        PARALLEL
+        Py_BEGIN_ALLOW_THREADS
+        OMP_FOR(THREADED)
         for (its = 0; its < it.nits4; its++) {
             Py_ssize_t i = 0;
             npy_DTYPE0 s[N03];
@@ -396,6 +602,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
             YP(DTYPE0, 0) = s;
         }
+        Py_END_ALLOW_THREADS
         free(it.ppa);
         return y;
     }
@@ -407,6 +614,7 @@ NAME(PyObject *self, PyObject *args, PyObject *kwds)
 {
     return reducer02(args,
                      kwds,
+                     THREADED,
                      NAME_float64,
                      NAME_float32,
                      NAME_int64,
@@ -419,15 +627,16 @@ NAME(PyObject *self, PyObject *args, PyObject *kwds)
 /* add sse3 to sum03 */
 
 /* repeat = {'NAME': ['sum04', 'p_sum04'],
-             'PARALLEL': ['', '#pragma omp parallel for']} */
+             'THREADED': ['0', '1']} */
 /* dtype = [['float64']] */
 static PyObject *
 NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
 {
     if (axis == fast_axis) {
         P_INIT(DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (it.length < 4) {
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 npy_intp i;
                 npy_DTYPE0 s = 0;
@@ -439,7 +648,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
         }
         else {
             Py_ssize_t i_unroll = it.length - it.length % 4;
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 Py_ssize_t i = 4;
                 npy_DTYPE0 s[4];
@@ -459,15 +668,16 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 py[its] = s[0] + s[1] + s[2] + s[3];
             }
         }
+        Py_END_ALLOW_THREADS
         return y;
     }
     else {
         npy_intp fast_length = PyArray_DIM(a, fast_axis);
-        char *pa = PyArray_BYTES(a);
         PyObject *y;
         if (!(C_CONTIGUOUS(a) || PyArray_NDIM(a) == 2) || fast_length & 1 ||
-            (npy_uintp)pa & 15) {
+            PyArray_STRIDE(a, fast_axis) != sizeof(double)) {
             INIT2(DTYPE0, DTYPE0)
+            Py_BEGIN_ALLOW_THREADS
             if (LENGTH < 4) {
                 WHILE {
                     FOR {
@@ -492,32 +702,34 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                     NEXT2
                 }
             }
+            Py_END_ALLOW_THREADS
             return y;
         }
         else {
             P_INIT2(DTYPE0)
+            Py_BEGIN_ALLOW_THREADS
             npy_intp a_offset = it.astride / sizeof(double);
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits4; its++) {
                 Py_ssize_t i;
                 double *ad = (double *)it.ppa[its];
                 double *yd = (double *)it.ppy[its];
                 __m128d s[4];
-                s[0] = _mm_load_pd(&ad[0]);
-                s[1] = _mm_load_pd(&ad[2]);
-                s[2] = _mm_load_pd(&ad[4]);
-                s[3] = _mm_load_pd(&ad[6]);
+                s[0] = _mm_loadu_pd(&ad[0]);
+                s[1] = _mm_loadu_pd(&ad[2]);
+                s[2] = _mm_loadu_pd(&ad[4]);
+                s[3] = _mm_loadu_pd(&ad[6]);
                 for (i = 1; i < it.length; i++) {
-                    s[0] += _mm_load_pd(&ad[0 + i * a_offset]);
-                    s[1] += _mm_load_pd(&ad[2 + i * a_offset]);
-                    s[2] += _mm_load_pd(&ad[4 + i * a_offset]);
-                    s[3] += _mm_load_pd(&ad[6 + i * a_offset]);
+                    s[0] += _mm_loadu_pd(&ad[0 + i * a_offset]);
+                    s[1] += _mm_loadu_pd(&ad[2 + i * a_offset]);
+                    s[2] += _mm_loadu_pd(&ad[4 + i * a_offset]);
+                    s[3] += _mm_loadu_pd(&ad[6 + i * a_offset]);
                 }
                 /* works for arrays that are 2d or C contiguous or both */
-                _mm_store_pd(&yd[0], s[0]);
-                _mm_store_pd(&yd[2], s[1]);
-                _mm_store_pd(&yd[4], s[2]);
-                _mm_store_pd(&yd[6], s[3]);
+                _mm_storeu_pd(&yd[0], s[0]);
+                _mm_storeu_pd(&yd[2], s[1]);
+                _mm_storeu_pd(&yd[4], s[2]);
+                _mm_storeu_pd(&yd[6], s[3]);
                 /* works for all arrays but is slow:
                 _mm_storel_pd(&yd[0 * it.fast_ystride/sizeof(double)], s[0]);
                 _mm_storeh_pd(&yd[1 * it.fast_ystride/sizeof(double)], s[0]);
@@ -537,6 +749,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 }
                 YP(DTYPE0, 0) = s;
             }
+            Py_END_ALLOW_THREADS
             free(it.ppa);
             return y;
         }
@@ -546,15 +759,16 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
 /* repeat end */
 
 /* repeat = {'NAME': ['sum04', 'p_sum04'],
-             'PARALLEL': ['', '#pragma omp parallel for']} */
+             'THREADED': ['0', '1']} */
 /* dtype = [['float32'], ['int64'], ['int32']] */
 static PyObject *
 NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
 {
     if (axis == fast_axis) {
         P_INIT(DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (it.length < 4) {
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 npy_intp i;
                 npy_DTYPE0 s = 0;
@@ -566,7 +780,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
         }
         else {
             Py_ssize_t i_unroll = it.length - it.length % 4;
-            PARALLEL
+            OMP_FOR(THREADED)
             for (its = 0; its < it.nits; its++) {
                 Py_ssize_t i = 4;
                 npy_DTYPE0 s[4];
@@ -586,11 +800,13 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 py[its] = s[0] + s[1] + s[2] + s[3];
             }
         }
+        Py_END_ALLOW_THREADS
         return y;
     }
     else {
         P_INIT2(DTYPE0)
-        PARALLEL
+        Py_BEGIN_ALLOW_THREADS
+        OMP_FOR(THREADED)
         for (its = 0; its < it.nits4; its++) {
             Py_ssize_t i = 0;
             npy_DTYPE0 s[N03];
@@ -629,6 +845,7 @@ NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
             YP(DTYPE0, 0) = s;
         }
+        Py_END_ALLOW_THREADS
         free(it.ppa);
         return y;
     }
@@ -640,6 +857,7 @@ NAME(PyObject *self, PyObject *args, PyObject *kwds)
 {
     return reducer02(args,
                      kwds,
+                     THREADED,
                      NAME_float64,
                      NAME_float32,
                      NAME_int64,
@@ -659,6 +877,7 @@ sum10_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 npy_DTYPE0 asum = 0;
@@ -689,9 +908,11 @@ sum10_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 FOR {
@@ -716,6 +937,7 @@ sum10_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT2
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -726,6 +948,7 @@ sum10(PyObject *self, PyObject *args, PyObject *kwds)
 {
     return reducer02(args,
                      kwds,
+                     0,
                      sum10_float64,
                      sum10_float32,
                      sum10_int64,
@@ -753,6 +976,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 9 || !IS_CONTIGUOUS(a)) {
             /* could loop unroll here */
             WHILE {
@@ -763,7 +987,6 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            const Py_ssize_t i_simd = LENGTH - LENGTH % 8;
             WHILE {
                 double sum_simd, sum = 0.0;
                 double *ad = (double *)it.pa;
@@ -773,16 +996,16 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 for (; i < peel; i++) {
                     sum += ad[i];
                 }
-                vsum0 = _mm_load_pd(&ad[peel + 0]);
-                vsum1 = _mm_load_pd(&ad[peel + 2]);
-                vsum2 = _mm_load_pd(&ad[peel + 4]);
-                vsum3 = _mm_load_pd(&ad[peel + 6]);
-                for (i = i + 8; i < i_simd + peel; i += 8)
+                vsum0 = _mm_loadu_pd(&ad[peel + 0]);
+                vsum1 = _mm_loadu_pd(&ad[peel + 2]);
+                vsum2 = _mm_loadu_pd(&ad[peel + 4]);
+                vsum3 = _mm_loadu_pd(&ad[peel + 6]);
+                for (i = peel + 8; i + 8 <= LENGTH; i += 8)
                 {
-                    __m128d v0 = _mm_load_pd(&ad[i]);
-                    __m128d v1 = _mm_load_pd(&ad[i + 2]);
-                    __m128d v2 = _mm_load_pd(&ad[i + 4]);
-                    __m128d v3 = _mm_load_pd(&ad[i + 6]);
+                    __m128d v0 = _mm_loadu_pd(&ad[i]);
+                    __m128d v1 = _mm_loadu_pd(&ad[i + 2]);
+                    __m128d v2 = _mm_loadu_pd(&ad[i + 4]);
+                    __m128d v3 = _mm_loadu_pd(&ad[i + 6]);
                     vsum0 = _mm_add_pd(vsum0, v0);
                     vsum1 = _mm_add_pd(vsum1, v1);
                     vsum2 = _mm_add_pd(vsum2, v2);
@@ -800,9 +1023,11 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 9) {
             WHILE {
                 FOR {
@@ -812,7 +1037,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            if (!IS_CONTIGUOUS(a) || LENGTH & 1 || (npy_uintp)it.pa & 15) {
+            if (!IS_CONTIGUOUS(a) || LENGTH & 1) {
                 const Py_ssize_t repeat = LENGTH - LENGTH % 4;
                 WHILE {
                     npy_intp i = 0;
@@ -836,20 +1061,20 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                     npy_intp i = 0;
                     for (; i < i_simd; i += 8)
                     {
-                        __m128d a0 = _mm_load_pd(&ad[i]);
-                        __m128d a1 = _mm_load_pd(&ad[i + 2]);
-                        __m128d a2 = _mm_load_pd(&ad[i + 4]);
-                        __m128d a3 = _mm_load_pd(&ad[i + 6]);
-
-                        __m128d y0 = _mm_load_pd(&yd[i]);
-                        __m128d y1 = _mm_load_pd(&yd[i + 2]);
-                        __m128d y2 = _mm_load_pd(&yd[i + 4]);
-                        __m128d y3 = _mm_load_pd(&yd[i + 6]);
-
-                        _mm_store_pd(&yd[i],     _mm_add_pd(y0, a0));
-                        _mm_store_pd(&yd[i + 2], _mm_add_pd(y1, a1));
-                        _mm_store_pd(&yd[i + 4], _mm_add_pd(y2, a2));
-                        _mm_store_pd(&yd[i + 6], _mm_add_pd(y3, a3));
+                        __m128d a0 = _mm_loadu_pd(&ad[i]);
+                        __m128d a1 = _mm_loadu_pd(&ad[i + 2]);
+                        __m128d a2 = _mm_loadu_pd(&ad[i + 4]);
+                        __m128d a3 = _mm_loadu_pd(&ad[i + 6]);
+
+                        __m128d y0 = _mm_loadu_pd(&yd[i]);
+                        __m128d y1 = _mm_loadu_pd(&yd[i + 2]);
+                        __m128d y2 = _mm_loadu_pd(&yd[i + 4]);
+                        __m128d y3 = _mm_loadu_pd(&yd[i + 6]);
+
+                        _mm_storeu_pd(&yd[i],     _mm_add_pd(y0, a0));
+                        _mm_storeu_pd(&yd[i + 2], _mm_add_pd(y1, a1));
+                        _mm_storeu_pd(&yd[i + 4], _mm_add_pd(y2, a2));
+                        _mm_storeu_pd(&yd[i + 6], _mm_add_pd(y3, a3));
                     }
                     for (; i < LENGTH; i++) {
                         yd[i] += ad[i];
@@ -858,6 +1083,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 }
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -870,7 +1096,8 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
-        if (LENGTH < 17 || !IS_CONTIGUOUS(a)) {
+        Py_BEGIN_ALLOW_THREADS
+        if (LENGTH < 19 || !IS_CONTIGUOUS(a)) {
             /* could loop unroll here */
             WHILE {
                 npy_DTYPE0 asum = 0;
@@ -880,7 +1107,6 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            const Py_ssize_t i_simd = LENGTH - LENGTH % 16;
             WHILE {
                 float sum_simd, sum = 0.0;
                 float *ad = (float *)it.pa;
@@ -890,16 +1116,16 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 for (; i < peel; i++) {
                     sum += ad[i];
                 }
-                vsum0 = _mm_load_ps(&ad[peel + 0]);
-                vsum1 = _mm_load_ps(&ad[peel + 4]);
-                vsum2 = _mm_load_ps(&ad[peel + 8]);
-                vsum3 = _mm_load_ps(&ad[peel + 12]);
-                for (i = i + 16; i < i_simd + peel; i += 16)
+                vsum0 = _mm_loadu_ps(&ad[peel + 0]);
+                vsum1 = _mm_loadu_ps(&ad[peel + 4]);
+                vsum2 = _mm_loadu_ps(&ad[peel + 8]);
+                vsum3 = _mm_loadu_ps(&ad[peel + 12]);
+                for (i = peel + 16; i + 16 <= LENGTH; i += 16)
                 {
-                    __m128 v0 = _mm_load_ps(&ad[i]);
-                    __m128 v1 = _mm_load_ps(&ad[i + 4]);
-                    __m128 v2 = _mm_load_ps(&ad[i + 8]);
-                    __m128 v3 = _mm_load_ps(&ad[i + 12]);
+                    __m128 v0 = _mm_loadu_ps(&ad[i]);
+                    __m128 v1 = _mm_loadu_ps(&ad[i + 4]);
+                    __m128 v2 = _mm_loadu_ps(&ad[i + 8]);
+                    __m128 v3 = _mm_loadu_ps(&ad[i + 12]);
                     vsum0 = _mm_add_ps(vsum0, v0);
                     vsum1 = _mm_add_ps(vsum1, v1);
                     vsum2 = _mm_add_ps(vsum2, v2);
@@ -922,9 +1148,11 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 FOR {
@@ -934,7 +1162,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            if (!IS_CONTIGUOUS(a) || LENGTH & 3 || (npy_uintp)it.pa & 15) {
+            if (!IS_CONTIGUOUS(a) || LENGTH & 3) {
                 const Py_ssize_t repeat = LENGTH - LENGTH % 4;
                 WHILE {
                     npy_intp i = 0;
@@ -958,20 +1186,20 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                     npy_intp i = 0;
                     for (; i < i_simd; i += 16)
                     {
-                        __m128 a0 = _mm_load_ps(&ad[i]);
-                        __m128 a1 = _mm_load_ps(&ad[i + 4]);
-                        __m128 a2 = _mm_load_ps(&ad[i + 8]);
-                        __m128 a3 = _mm_load_ps(&ad[i + 12]);
-
-                        __m128 y0 = _mm_load_ps(&yd[i]);
-                        __m128 y1 = _mm_load_ps(&yd[i + 4]);
-                        __m128 y2 = _mm_load_ps(&yd[i + 8]);
-                        __m128 y3 = _mm_load_ps(&yd[i + 12]);
-
-                        _mm_store_ps(&yd[i],     _mm_add_ps(y0, a0));
-                        _mm_store_ps(&yd[i + 4], _mm_add_ps(y1, a1));
-                        _mm_store_ps(&yd[i + 8], _mm_add_ps(y2, a2));
-                        _mm_store_ps(&yd[i + 12], _mm_add_ps(y3, a3));
+                        __m128 a0 = _mm_loadu_ps(&ad[i]);
+                        __m128 a1 = _mm_loadu_ps(&ad[i + 4]);
+                        __m128 a2 = _mm_loadu_ps(&ad[i + 8]);
+                        __m128 a3 = _mm_loadu_ps(&ad[i + 12]);
+
+                        __m128 y0 = _mm_loadu_ps(&yd[i]);
+                        __m128 y1 = _mm_loadu_ps(&yd[i + 4]);
+                        __m128 y2 = _mm_loadu_ps(&yd[i + 8]);
+                        __m128 y3 = _mm_loadu_ps(&yd[i + 12]);
+
+                        _mm_storeu_ps(&yd[i],     _mm_add_ps(y0, a0));
+                        _mm_storeu_ps(&yd[i + 4], _mm_add_ps(y1, a1));
+                        _mm_storeu_ps(&yd[i + 8], _mm_add_ps(y2, a2));
+                        _mm_storeu_ps(&yd[i + 12], _mm_add_ps(y3, a3));
                     }
                     for (; i < LENGTH; i++) {
                         yd[i] += ad[i];
@@ -980,6 +1208,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 }
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -992,6 +1221,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 npy_DTYPE0 asum = 0;
@@ -1022,9 +1252,11 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 FOR {
@@ -1049,6 +1281,7 @@ sum11_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT2
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -1059,6 +1292,7 @@ sum11(PyObject *self, PyObject *args, PyObject *kwds)
 {
     return reducer02(args,
                      kwds,
+                     0,
                      sum11_float64,
                      sum11_float32,
                      sum11_int64,
@@ -1077,6 +1311,7 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 19 || !IS_CONTIGUOUS(a)) {
             /* could loop unroll here */
             WHILE {
@@ -1087,7 +1322,6 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            Py_ssize_t i_simd = LENGTH - LENGTH % 16;
             WHILE {
                 double sum_simd, sum = 0.0;
                 double *ad = (double *)it.pa;
@@ -1097,16 +1331,16 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 for (; i < peel; i++) {
                     sum += ad[i];
                 }
-                vsum0 = _mm256_load_pd(&ad[peel + 0]);
-                vsum1 = _mm256_load_pd(&ad[peel + 4]);
-                vsum2 = _mm256_load_pd(&ad[peel + 8]);
-                vsum3 = _mm256_load_pd(&ad[peel + 12]);
-                for (i = i + 16; i < i_simd + peel; i += 16)
+                vsum0 = _mm256_loadu_pd(&ad[peel + 0]);
+                vsum1 = _mm256_loadu_pd(&ad[peel + 4]);
+                vsum2 = _mm256_loadu_pd(&ad[peel + 8]);
+                vsum3 = _mm256_loadu_pd(&ad[peel + 12]);
+                for (i = peel + 16; i + 16 <= LENGTH; i += 16)
                 {
-                    __m256d v0 = _mm256_load_pd(&ad[i]);
-                    __m256d v1 = _mm256_load_pd(&ad[i + 4]);
-                    __m256d v2 = _mm256_load_pd(&ad[i + 8]);
-                    __m256d v3 = _mm256_load_pd(&ad[i + 12]);
+                    __m256d v0 = _mm256_loadu_pd(&ad[i]);
+                    __m256d v1 = _mm256_loadu_pd(&ad[i + 4]);
+                    __m256d v2 = _mm256_loadu_pd(&ad[i + 8]);
+                    __m256d v3 = _mm256_loadu_pd(&ad[i + 12]);
                     vsum0 = _mm256_add_pd(vsum0, v0);
                     vsum1 = _mm256_add_pd(vsum1, v1);
                     vsum2 = _mm256_add_pd(vsum2, v2);
@@ -1127,9 +1361,11 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 9) {
             WHILE {
                 FOR {
@@ -1139,7 +1375,7 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
             }
         }
         else {
-            if (!IS_CONTIGUOUS(a) || LENGTH & 1 || (npy_uintp)it.pa & 15) {
+            if (!IS_CONTIGUOUS(a) || LENGTH & 1) {
                 const Py_ssize_t repeat = LENGTH - LENGTH % 4;
                 WHILE {
                     npy_intp i = 0;
@@ -1163,20 +1399,20 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                     npy_intp i = 0;
                     for (; i < i_simd; i += 8)
                     {
-                        __m128d a0 = _mm_load_pd(&ad[i]);
-                        __m128d a1 = _mm_load_pd(&ad[i + 2]);
-                        __m128d a2 = _mm_load_pd(&ad[i + 4]);
-                        __m128d a3 = _mm_load_pd(&ad[i + 6]);
-
-                        __m128d y0 = _mm_load_pd(&yd[i]);
-                        __m128d y1 = _mm_load_pd(&yd[i + 2]);
-                        __m128d y2 = _mm_load_pd(&yd[i + 4]);
-                        __m128d y3 = _mm_load_pd(&yd[i + 6]);
-
-                        _mm_store_pd(&yd[i],     _mm_add_pd(y0, a0));
-                        _mm_store_pd(&yd[i + 2], _mm_add_pd(y1, a1));
-                        _mm_store_pd(&yd[i + 4], _mm_add_pd(y2, a2));
-                        _mm_store_pd(&yd[i + 6], _mm_add_pd(y3, a3));
+                        __m128d a0 = _mm_loadu_pd(&ad[i]);
+                        __m128d a1 = _mm_loadu_pd(&ad[i + 2]);
+                        __m128d a2 = _mm_loadu_pd(&ad[i + 4]);
+                        __m128d a3 = _mm_loadu_pd(&ad[i + 6]);
+
+                        __m128d y0 = _mm_loadu_pd(&yd[i]);
+                        __m128d y1 = _mm_loadu_pd(&yd[i + 2]);
+                        __m128d y2 = _mm_loadu_pd(&yd[i + 4]);
+                        __m128d y3 = _mm_loadu_pd(&yd[i + 6]);
+
+                        _mm_storeu_pd(&yd[i],     _mm_add_pd(y0, a0));
+                        _mm_storeu_pd(&yd[i + 2], _mm_add_pd(y1, a1));
+                        _mm_storeu_pd(&yd[i + 4], _mm_add_pd(y2, a2));
+                        _mm_storeu_pd(&yd[i + 6], _mm_add_pd(y3, a3));
                     }
                     for (; i < LENGTH; i++) {
                         yd[i] += ad[i];
@@ -1185,6 +1421,7 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 }
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -1197,6 +1434,7 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
     PyObject *y;
     if (axis == fast_axis) {
         INIT01(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 npy_DTYPE0 asum = 0;
@@ -1227,9 +1465,11 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT
             }
         }
+        Py_END_ALLOW_THREADS
     }
     else {
         INIT2(DTYPE0, DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
         if (LENGTH < 4) {
             WHILE {
                 FOR {
@@ -1254,6 +1494,7 @@ sum12_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
                 NEXT2
             }
         }
+        Py_END_ALLOW_THREADS
     }
     return y;
 }
@@ -1264,6 +1505,7 @@ sum12(PyObject *self, PyObject *args, PyObject *kwds)
 {
     return reducer02(args,
                      kwds,
+                     0,
                      sum12_float64,
                      sum12_float32,
                      sum12_int64,
@@ -1271,288 +1513,1810 @@ sum12(PyObject *self, PyObject *args, PyObject *kwds)
 }
 
 
-/* python strings -------------------------------------------------------- */
-
-PyObject *pystr_a = NULL;
-PyObject *pystr_axis = NULL;
+/* sum13, p_sum13 -------------------------------------------------------- */
 
-static int
-intern_strings(void) {
-    pystr_a = PyString_InternFromString("a");
-    pystr_axis = PyString_InternFromString("axis");
-    return pystr_a && pystr_axis;
-}
+/* sum03 generated over a grid of the number of columns summed at once along
+ * the non-fast axis (UNROLL), the number of accumulators along the fast axis
+ * (NACC) and the length below which plain loops are used (CUTOFF). The hard
+ * coded choice of sum03 is u8_a4_c4. Which variant sum13 and p_sum13 use is
+ * set at run time; femto.autotune() picks the fastest on the current host.
+ * Single and multi-threaded versions share variants through the `parallel`
+ * argument, which switches OpenMP on and off. */
 
-/* reducer --------------------------------------------------------------- */
+typedef PyObject *(*ftune_t)(PyArrayObject *a, int axis, int fast_axis,
+                             int parallel);
 
-static BN_INLINE int
-parse_args(PyObject *args,
-           PyObject *kwds,
-           PyObject **a,
-           PyObject **axis)
+/* the grid below must match the grid of the sum13_variants table */
+/* repeat grid = {'UNROLL': ['4', '8', '16'],
+                  'NACC': ['2', '4', '8'],
+                  'CUTOFF': ['4', '16']} */
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static PyObject *
+sum13_uUNROLL_aNACC_cCUTOFF_DTYPE0(PyArrayObject *a, int axis, int fast_axis,
+                                    int parallel)
 {
-    const Py_ssize_t nargs = PyTuple_GET_SIZE(args);
-    const Py_ssize_t nkwds = kwds == NULL ? 0 : PyDict_Size(kwds);
-    if (nkwds) {
-        int nkwds_found = 0;
-        PyObject *tmp;
-        switch (nargs) {
-            case 1: *a = PyTuple_GET_ITEM(args, 0);
-            case 0: break;
-            default:
-                TYPE_ERR("wrong number of arguments");
-                return 0;
+    if (axis == fast_axis) {
+        P_INIT(DTYPE0)
+        Py_BEGIN_ALLOW_THREADS
+        if (it.length < CUTOFF || it.length < NACC) {
+            #pragma omp parallel for schedule(static) if (parallel)
+            for (its = 0; its < it.nits; its++) {
+                npy_intp i;
+                npy_DTYPE0 s = 0;
+                for (i = 0; i < it.length; i++) {
+                    s += A(DTYPE0, i);
+                }
+                py[its] = s;
+            }
         }
-        switch (nargs) {
-            case 0:
-                *a = PyDict_GetItem(kwds, pystr_a);
-                if (*a == NULL) {
-                    TYPE_ERR("Cannot find `a` keyword input");
-                    return 0;
+        else {
+            Py_ssize_t i_unroll = it.length - it.length % NACC;
+            #pragma omp parallel for schedule(static) if (parallel)
+            for (its = 0; its < it.nits; its++) {
+                Py_ssize_t i, k;
+                npy_DTYPE0 s[NACC];
+                #pragma GCC unroll NACC
+                for (k = 0; k < NACC; k++) {
+                    s[k] = A(DTYPE0, k);
                 }
-                nkwds_found += 1;
-            case 1:
-                tmp = PyDict_GetItem(kwds, pystr_axis);
-                if (tmp != NULL) {
-                    *axis = tmp;
-                    nkwds_found++;
+                for (i = NACC; i < i_unroll; i += NACC) {
+                    #pragma GCC unroll NACC
+                    for (k = 0; k < NACC; k++) {
+                        s[k] += A(DTYPE0, i + k);
+                    }
                 }
-                break;
-            default:
-                TYPE_ERR("wrong number of arguments");
-                return 0;
-        }
-        if (nkwds_found != nkwds) {
-            TYPE_ERR("wrong number of keyword arguments");
-            return 0;
-        }
-        if (nargs + nkwds_found > 2) {
-            TYPE_ERR("too many arguments");
-            return 0;
+                for (; i < it.length; i++) {
+                    s[0] += A(DTYPE0, i);
+                }
+                for (k = 1; k < NACC; k++) {
+                    s[0] += s[k];
+                }
+                py[its] = s[0];
+            }
         }
+        Py_END_ALLOW_THREADS
+        P_RETURN
     }
     else {
-        switch (nargs) {
-            case 2:
-                *axis = PyTuple_GET_ITEM(args, 1);
-            case 1:
-                *a = PyTuple_GET_ITEM(args, 0);
-                break;
-            default:
-                TYPE_ERR("wrong number of arguments");
-                return 0;
+        npy_intp its0 = 0;
+        npy_intp ntile = PyArray_DIM(a, fast_axis) < CUTOFF ? 1 : UNROLL;
+        P_INIT2_TILE(DTYPE0, ntile)
+        Py_BEGIN_ALLOW_THREADS
+        if (ntile == UNROLL) {
+            #pragma omp parallel for schedule(static) if (parallel)
+            for (its = 0; its < it.nits4; its++) {
+                Py_ssize_t i, k;
+                npy_DTYPE0 s[UNROLL];
+                #pragma GCC unroll UNROLL
+                for (k = 0; k < UNROLL; k++) {
+                    s[k] = 0;
+                }
+                for (i = 0; i < it.length; i++) {
+                    #pragma GCC unroll UNROLL
+                    for (k = 0; k < UNROLL; k++) {
+                        s[k] += AP(DTYPE0, k);
+                    }
+                }
+                #pragma GCC unroll UNROLL
+                for (k = 0; k < UNROLL; k++) {
+                    YP(DTYPE0, k) = s[k];
+                }
+            }
+            its0 = it.nits4;
+        }
+        #pragma omp parallel for schedule(static) if (parallel)
+        for (its = its0; its < it.nits; its++) {
+            npy_intp i;
+            npy_DTYPE0 s = 0;
+            for (i = 0; i < it.length; i++) {
+                s += AP(DTYPE0, 0);
+            }
+            YP(DTYPE0, 0) = s;
         }
+        Py_END_ALLOW_THREADS
+        free(it.ppa);
+        return y;
     }
+}
+/* dtype end */
+/* repeat end */
+
+struct _variant {
+    const char *name;
+    int        unroll;
+    int        nacc;
+    int        cutoff;
+    ftune_t    f[4];    /* float64, float32, int64, int32 */
+};
+
+static struct _variant sum13_variants[] = {
+/* repeat grid = {'UNROLL': ['4', '8', '16'],
+                  'NACC': ['2', '4', '8'],
+                  'CUTOFF': ['4', '16']} */
+    {"uUNROLL_aNACC_cCUTOFF", UNROLL, NACC, CUTOFF,
+     {sum13_uUNROLL_aNACC_cCUTOFF_float64,
+      sum13_uUNROLL_aNACC_cCUTOFF_float32,
+      sum13_uUNROLL_aNACC_cCUTOFF_int64,
+      sum13_uUNROLL_aNACC_cCUTOFF_int32}},
+/* repeat end */
+};
 
+#define N13 ((Py_ssize_t)(sizeof(sum13_variants) / sizeof(sum13_variants[0])))
+
+/* index into sum13_variants used by sum13 [0] and p_sum13 [1] */
+static Py_ssize_t sum13_choice[2] = {0, 0};
+
+/* The variants saved by femto.autotune are applied by femto.tune.load_config
+ * on the first call of sum13 or p_sum13 (or of _sum13_get) rather than when
+ * femto is imported, unless a variant was set with _sum13_set before. */
+static int sum13_configured = 0;
+
+static int
+sum13_configure(void)
+{
+    PyObject *tune, *config;
+    if (sum13_configured) return 1;
+    sum13_configured = 1;
+    tune = PyImport_ImportModule("femto.tune");
+    if (tune == NULL) return 0;
+    config = PyObject_CallMethod(tune, "load_config", NULL);
+    Py_DECREF(tune);
+    if (config == NULL) return 0;
+    Py_DECREF(config);
     return 1;
+}
 
+static Py_ssize_t
+find_variant(const char *name)
+{
+    Py_ssize_t i;
+    for (i = 0; i < N13; i++) {
+        if (strcmp(sum13_variants[i].name, name) == 0) {
+            return i;
+        }
+    }
+    return -1;
 }
 
+/* repeat = {'NAME': ['sum13', 'p_sum13'],
+             'PARALLEL': ['0', '1']} */
+/* dtype = [['float64', '0'], ['float32', '1'], ['int64', '2'],
+            ['int32', '3']] */
 static PyObject *
-reducer(PyObject *args,
-        PyObject *kwds,
-        fone_t f_float64,
-        fone_t f_float32,
-        fone_t f_int64,
-        fone_t f_int32)
+NAME_DTYPE0(PyArrayObject *a, int axis, int fast_axis)
 {
+    struct _variant *v = &sum13_variants[sum13_choice[PARALLEL]];
+    return v->f[DTYPE1](a, axis, fast_axis, PARALLEL);
+}
+/* dtype end */
 
-    int ndim;
-    int axis;
-    int dtype;
-
-    PyArrayObject *a;
-
-    PyObject *a_obj = NULL;
-    PyObject *axis_obj = NULL;
-
-    if (!parse_args(args, kwds, &a_obj, &axis_obj)) return NULL;
+static PyObject *
+NAME(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    if (!sum13_configure()) return NULL;
+    return reducer02(args,
+                     kwds,
+                     PARALLEL,
+                     NAME_float64,
+                     NAME_float32,
+                     NAME_int64,
+                     NAME_int32);
+}
+/* repeat end */
 
-    /* convert to array if necessary */
-    if PyArray_Check(a_obj) {
-        a = (PyArrayObject *)a_obj;
-    } else {
-        a = (PyArrayObject *)PyArray_FROM_O(a_obj);
-        if (a == NULL) {
+static PyObject *
+sum13_variant_list(PyObject *self, PyObject *args)
+{
+    Py_ssize_t i;
+    PyObject *variants = PyList_New(N13);
+    if (variants == NULL) return NULL;
+    for (i = 0; i < N13; i++) {
+        struct _variant *v = &sum13_variants[i];
+        PyObject *t = Py_BuildValue("(siii)", v->name, v->unroll, v->nacc,
+                                    v->cutoff);
+        if (t == NULL) {
+            Py_DECREF(variants);
             return NULL;
         }
+        PyList_SET_ITEM(variants, i, t);
     }
+    return variants;
+}
+
+static PyObject *
+sum13_variant_get(PyObject *self, PyObject *args)
+{
+    int parallel;
+    if (!PyArg_ParseTuple(args, "i", &parallel)) return NULL;
+    if (!sum13_configure()) return NULL;
+    return Py_BuildValue("s", sum13_variants[sum13_choice[!!parallel]].name);
+}
 
-    /* check for byte swapped input array */
-    if PyArray_ISBYTESWAPPED(a) {
-        VALUE_ERR("Byte-swapped arrays are not supported");
+static PyObject *
+sum13_variant_set(PyObject *self, PyObject *args)
+{
+    int parallel;
+    const char *name;
+    Py_ssize_t idx;
+    if (!PyArg_ParseTuple(args, "si", &name, &parallel)) return NULL;
+    idx = find_variant(name);
+    if (idx < 0) {
+        PyErr_Format(PyExc_ValueError, "unknown sum13 variant `%s`", name);
         return NULL;
     }
+    sum13_choice[!!parallel] = idx;
+    sum13_configured = 1;
+    Py_RETURN_NONE;
+}
 
-    /* does user want to reduce over all axes? */
-    if (axis_obj == Py_None) {
-        VALUE_ERR("`axis` cannot be None");
-        return NULL;
+
+/* cumsum, p_cumsum ------------------------------------------------------ */
+
+/* Cumulative sum along an axis. Along the fast axis each slice is scanned
+ * with an in-register SIMD prefix sum (float64, float32; integer adds are
+ * already cheap). Along a non-fast axis a row at a time is added to the
+ * previous row of the output, as sum12 does when reducing along a non-fast
+ * axis, in blocks of columns so that p_cumsum has independent work for each
+ * thread. A few long slices along the fast axis do not keep the threads of
+ * p_cumsum busy, so each such slice is scanned in two passes: each thread
+ * sums its block, then each thread scans its block starting from the sum of
+ * the blocks before it. */
+
+/* min length of a slice scanned in two passes by p_cumsum */
+#define CUMSUM_SPLIT 65536
+
+/* number of columns in a block when scanning along a non-fast axis */
+#define CUMSUM_COLS 256
+
+#define LOADU_SI128(p) _mm_loadu_si128((const __m128i *)(p))
+#define STOREU_SI128(p, v) _mm_storeu_si128((__m128i *)(p), v)
+
+#define CA(dtype, i) *(npy_##dtype *)(pa + (i) * astride)
+#define CY(dtype, i) *(npy_##dtype *)(py + (i) * ystride)
+
+/* scan n elements starting from `carry`; returns the last sum */
+
+/* dtype = [['float64']] */
+static BN_INLINE npy_DTYPE0
+scan_DTYPE0(char *pa, char *py, npy_intp n, npy_intp astride,
+            npy_intp ystride, npy_DTYPE0 carry)
+{
+    npy_intp i = 0;
+    if (astride == sizeof(npy_DTYPE0) && ystride == sizeof(npy_DTYPE0)) {
+        const npy_DTYPE0 *ad = (npy_DTYPE0 *)pa;
+        npy_DTYPE0 *yd = (npy_DTYPE0 *)py;
+        const __m256d zero = _mm256_setzero_pd();
+        __m256d vcarry = _mm256_set1_pd(carry);
+        for (; i + 4 <= n; i += 4) {
+            /* x = [a0, a1, a2, a3] */
+            __m256d x = _mm256_loadu_pd(&ad[i]);
+            /* x += [0, a0, 0, a2] */
+            x = _mm256_add_pd(x, _mm256_blend_pd(zero,
+                              _mm256_permute_pd(x, 0x5), 0xa));
+            /* x += [0, 0, x1, x1] */
+            x = _mm256_add_pd(x, _mm256_permute2f128_pd(
+                              _mm256_permute_pd(x, 0xf),
+                              _mm256_permute_pd(x, 0xf), 0x08));
+            x = _mm256_add_pd(x, vcarry);
+            _mm256_storeu_pd(&yd[i], x);
+            /* broadcast x3 */
+            vcarry = _mm256_permute_pd(x, 0xf);
+            vcarry = _mm256_permute2f128_pd(vcarry, vcarry, 0x11);
+        }
+        carry = _mm256_cvtsd_f64(vcarry);
     }
-    else if (axis_obj == NULL) {
-        ndim = PyArray_NDIM(a);
-        if (ndim < 2) {
-            VALUE_ERR("ndim must be > 1");
-            return NULL;
+    for (; i < n; i++) {
+        carry += CA(DTYPE0, i);
+        CY(DTYPE0, i) = carry;
+    }
+    return carry;
+}
+/* dtype end */
+
+/* dtype = [['float32']] */
+static BN_INLINE npy_DTYPE0
+scan_DTYPE0(char *pa, char *py, npy_intp n, npy_intp astride,
+            npy_intp ystride, npy_DTYPE0 carry)
+{
+    npy_intp i = 0;
+    if (astride == sizeof(npy_DTYPE0) && ystride == sizeof(npy_DTYPE0)) {
+        const npy_DTYPE0 *ad = (npy_DTYPE0 *)pa;
+        npy_DTYPE0 *yd = (npy_DTYPE0 *)py;
+        __m128 vcarry = _mm_set1_ps(carry);
+        for (; i + 4 <= n; i += 4) {
+            /* x = [a0, a1, a2, a3] */
+            __m128 x = _mm_loadu_ps(&ad[i]);
+            /* x += [0, a0, a1, a2] */
+            x = _mm_add_ps(x, _mm_castsi128_ps(
+                           _mm_slli_si128(_mm_castps_si128(x), 4)));
+            /* x += [0, 0, x0, x1] */
+            x = _mm_add_ps(x, _mm_castsi128_ps(
+                           _mm_slli_si128(_mm_castps_si128(x), 8)));
+            x = _mm_add_ps(x, vcarry);
+            _mm_storeu_ps(&yd[i], x);
+            /* broadcast x3 */
+            vcarry = _mm_shuffle_ps(x, x, _MM_SHUFFLE(3, 3, 3, 3));
+        }
+        carry = _mm_cvtss_f32(vcarry);
+    }
+    for (; i < n; i++) {
+        carry += CA(DTYPE0, i);
+        CY(DTYPE0, i) = carry;
+    }
+    return carry;
+}
+/* dtype end */
+
+/* dtype = [['int64'], ['int32']] */
+static BN_INLINE npy_DTYPE0
+scan_DTYPE0(char *pa, char *py, npy_intp n, npy_intp astride,
+            npy_intp ystride, npy_DTYPE0 carry)
+{
+    npy_intp i;
+    for (i = 0; i < n; i++) {
+        carry += CA(DTYPE0, i);
+        CY(DTYPE0, i) = carry;
+    }
+    return carry;
+}
+/* dtype end */
+
+/* one long slice scanned by all threads: block sums, then offset scans */
+
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static void
+scan_twopass_DTYPE0(char *pa, char *py, npy_intp n, npy_intp astride,
+                    npy_intp ystride)
+{
+    const int nthreads = omp_get_max_threads();
+    npy_DTYPE0 *offset = malloc((nthreads + 1) * sizeof(npy_DTYPE0));
+    if (offset == NULL) {
+        scan_DTYPE0(pa, py, n, astride, ystride, 0);
+        return;
+    }
+    #pragma omp parallel num_threads(nthreads)
+    {
+        const int t = omp_get_thread_num();
+        const int nt = omp_get_num_threads();
+        const npy_intp lo = n * t / nt;
+        const npy_intp hi = n * (t + 1) / nt;
+        npy_intp i;
+        npy_DTYPE0 s[4] = {0, 0, 0, 0};
+        for (i = lo; i + 4 <= hi; i += 4) {
+            s[0] += CA(DTYPE0, i);
+            s[1] += CA(DTYPE0, i + 1);
+            s[2] += CA(DTYPE0, i + 2);
+            s[3] += CA(DTYPE0, i + 3);
+        }
+        for (; i < hi; i++) {
+            s[0] += CA(DTYPE0, i);
+        }
+        offset[t + 1] = s[0] + s[1] + s[2] + s[3];
+        #pragma omp barrier
+        #pragma omp single
+        {
+            int k;
+            offset[0] = 0;
+            for (k = 1; k <= nt; k++) {
+                offset[k] += offset[k - 1];
+            }
+        }
+        scan_DTYPE0(pa + lo * astride, py + lo * ystride, hi - lo,
+                    astride, ystride, offset[t]);
+    }
+    free(offset);
+}
+/* dtype end */
+
+/* y[i] = y[i - 1] + a[i] for a block of ncols columns, a row at a time */
+
+#define CA2(dtype, i, j) \
+    *(npy_##dtype *)(pa + (i) * astride + (j) * fast_astride)
+#define CY2(dtype, i, j) \
+    *(npy_##dtype *)(py + (i) * ystride + (j) * fast_ystride)
+
+/* dtype = [['float64', '__m256d', '_mm256_loadu_pd', '_mm256_add_pd',
+             '_mm256_storeu_pd', '4'],
+            ['float32', '__m256', '_mm256_loadu_ps', '_mm256_add_ps',
+             '_mm256_storeu_ps', '8'],
+            ['int64', '__m128i', 'LOADU_SI128', '_mm_add_epi64',
+             'STOREU_SI128', '2'],
+            ['int32', '__m128i', 'LOADU_SI128', '_mm_add_epi32',
+             'STOREU_SI128', '4']] */
+static BN_INLINE void
+rows_DTYPE0(char *pa, char *py, npy_intp length, npy_intp ncols,
+            npy_intp astride, npy_intp ystride, npy_intp fast_astride,
+            npy_intp fast_ystride)
+{
+    npy_intp i, j;
+    if (length == 0) return;
+    for (j = 0; j < ncols; j++) {
+        CY2(DTYPE0, 0, j) = CA2(DTYPE0, 0, j);
+    }
+    if (fast_astride == sizeof(npy_DTYPE0) &&
+        fast_ystride == sizeof(npy_DTYPE0)) {
+        const npy_intp j_simd = ncols - ncols % DTYPE5;
+        for (i = 1; i < length; i++) {
+            const npy_DTYPE0 *ai = (npy_DTYPE0 *)(pa + i * astride);
+            const npy_DTYPE0 *yp = (npy_DTYPE0 *)(py + (i - 1) * ystride);
+            npy_DTYPE0 *yi = (npy_DTYPE0 *)(py + i * ystride);
+            for (j = 0; j < j_simd; j += DTYPE5) {
+                DTYPE1 v = DTYPE3(DTYPE2(&yp[j]), DTYPE2(&ai[j]));
+                DTYPE4(&yi[j], v);
+            }
+            for (; j < ncols; j++) {
+                yi[j] = yp[j] + ai[j];
+            }
         }
-        axis = PyArray_NDIM(a) - 1;
     }
     else {
-        axis = PyArray_PyIntAsInt(axis_obj);
-        if (error_converting(axis)) {
-            TYPE_ERR("`axis` must be an integer or None");
-            return NULL;
+        for (i = 1; i < length; i++) {
+            for (j = 0; j < ncols; j++) {
+                CY2(DTYPE0, i, j) = CY2(DTYPE0, i - 1, j) + CA2(DTYPE0, i, j);
+            }
         }
-        ndim = PyArray_NDIM(a);
-        if (axis < 0) {
-            axis += ndim;
-            if (axis < 0) {
-                PyErr_Format(PyExc_ValueError,
-                             "axis(=%d) out of bounds", axis);
-                return NULL;
+    }
+}
+/* dtype end */
+
+/* repeat = {'NAME': ['cumsum', 'p_cumsum'],
+             'PARALLEL': ['',
+                          '#pragma omp parallel for schedule(static)'],
+             'TWOPASS': ['0', '1']} */
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static int
+NAME_DTYPE0(PyArrayObject *a, PyArrayObject *y, int axis, int fast_axis)
+{
+    npy_intp its;
+    piter3 it;
+    if (!init_piter3(&it, a, y, axis, fast_axis)) return 0;
+    Py_BEGIN_ALLOW_THREADS
+    if (axis == fast_axis) {
+        if (TWOPASS && it.length >= CUMSUM_SPLIT &&
+            it.nits < omp_get_max_threads()) {
+            for (its = 0; its < it.nits; its++) {
+                scan_twopass_DTYPE0(it.ppa[its], it.ppy[its], it.length,
+                                    it.astride, it.ystride);
             }
         }
-        else if (axis >= ndim) {
-            PyErr_Format(PyExc_ValueError, "axis(=%d) out of bounds", axis);
-            return NULL;
+        else {
+            PARALLEL
+            for (its = 0; its < it.nits; its++) {
+                scan_DTYPE0(it.ppa[its], it.ppy[its], it.length,
+                            it.astride, it.ystride, 0);
+            }
+        }
+    }
+    else {
+        const npy_intp nblocks = (it.fast_length + CUMSUM_COLS - 1) /
+                                 CUMSUM_COLS;
+        PARALLEL
+        for (its = 0; its < it.nits * nblocks; its++) {
+            const npy_intp j = (its % nblocks) * CUMSUM_COLS;
+            const npy_intp ncols = it.fast_length - j < CUMSUM_COLS ?
+                                   it.fast_length - j : CUMSUM_COLS;
+            rows_DTYPE0(it.ppa[its / nblocks] + j * it.fast_astride,
+                        it.ppy[its / nblocks] + j * it.fast_ystride,
+                        it.length, ncols, it.astride, it.ystride,
+                        it.fast_astride, it.fast_ystride);
+        }
+    }
+    Py_END_ALLOW_THREADS
+    free(it.ppa);
+    return 1;
+}
+/* dtype end */
+
+static PyObject *
+NAME(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    return cumsummer(args,
+                     kwds,
+                     NAME_float64,
+                     NAME_float32,
+                     NAME_int64,
+                     NAME_int32);
+}
+/* repeat end */
+
+/* move_sum, move_mean ---------------------------------------------------- */
+
+/* Moving window sum and mean along an axis. Each output is updated from the
+ * previous one in O(1): the new element enters the running sum and count of
+ * non-NaN elements and the element that falls out of the window leaves it.
+ * Infinities are counted, by sign, instead of being added to the sum, where
+ * one that left the window would leave inf - inf = NaN behind.
+ * Along a non-fast axis a whole row of windows (a block of columns) is
+ * updated at once, so the updates vectorize, and the p_ functions have
+ * independent blocks to share among threads. */
+
+/* number of columns in a block when moving along a non-fast axis */
+#define MOVE_COLS 256
+
+/* window sum from the sum of its finite values and its counts of +inf and
+ * -inf */
+#define MOVE_VALUE(asum, npos, nneg) \
+    ((npos) ? ((nneg) ? BN_NAN : BN_INFINITY) : \
+              ((nneg) ? -BN_INFINITY : (asum)))
+
+/* one slice; the window is full after `window` elements */
+
+/* dtype = [['float64', 'float64'], ['float32', 'float32'],
+            ['int64', 'float64'], ['int32', 'float64']] */
+static BN_INLINE void
+move_slice_DTYPE0(char *pa, char *py, npy_intp length, npy_intp astride,
+                  npy_intp ystride, npy_intp window, npy_intp min_count,
+                  int mean)
+{
+    npy_intp i, count = 0, npos = 0, nneg = 0;
+    npy_DTYPE1 ai, asum = 0;
+    for (i = 0; i < length; i++) {
+        ai = CA(DTYPE0, i);
+        if (ai - ai == 0) {
+            asum += ai;
+            count++;
+        }
+        else if (ai == ai) {
+            npos += ai > 0;
+            nneg += ai < 0;
+            count++;
+        }
+        if (i >= window) {
+            ai = CA(DTYPE0, i - window);
+            if (ai - ai == 0) {
+                asum -= ai;
+                count--;
+            }
+            else if (ai == ai) {
+                npos -= ai > 0;
+                nneg -= ai < 0;
+                count--;
+            }
+        }
+        if (count >= min_count) {
+            const npy_DTYPE1 s = MOVE_VALUE(asum, npos, nneg);
+            CY(DTYPE1, i) = mean ? s / count : s;
+        }
+        else {
+            CY(DTYPE1, i) = BN_NAN;
+        }
+    }
+}
+/* dtype end */
+
+/* a block of ncols columns, one row of windows at a time */
+
+/* dtype = [['float64', 'float64'], ['float32', 'float32'],
+            ['int64', 'float64'], ['int32', 'float64']] */
+static BN_INLINE void
+move_rows_DTYPE0(char *pa, char *py, npy_intp length, npy_intp ncols,
+                 npy_intp astride, npy_intp ystride, npy_intp fast_astride,
+                 npy_intp fast_ystride, npy_intp window, npy_intp min_count,
+                 int mean)
+{
+    npy_intp i, j;
+    npy_DTYPE1 asum[MOVE_COLS];
+    npy_intp count[MOVE_COLS];
+    npy_intp npos[MOVE_COLS];
+    npy_intp nneg[MOVE_COLS];
+    for (j = 0; j < ncols; j++) {
+        asum[j] = 0;
+        count[j] = 0;
+        npos[j] = 0;
+        nneg[j] = 0;
+    }
+    for (i = 0; i < length; i++) {
+        #pragma omp simd
+        for (j = 0; j < ncols; j++) {
+            const npy_DTYPE1 ai = CA2(DTYPE0, i, j);
+            const int finite = ai - ai == 0;
+            asum[j] += finite ? ai : 0;
+            count[j] += ai == ai;
+            npos[j] += !finite && ai > 0;
+            nneg[j] += !finite && ai < 0;
+        }
+        if (i >= window) {
+            #pragma omp simd
+            for (j = 0; j < ncols; j++) {
+                const npy_DTYPE1 ai = CA2(DTYPE0, i - window, j);
+                const int finite = ai - ai == 0;
+                asum[j] -= finite ? ai : 0;
+                count[j] -= ai == ai;
+                npos[j] -= !finite && ai > 0;
+                nneg[j] -= !finite && ai < 0;
+            }
+        }
+        if (mean) {
+            #pragma omp simd
+            for (j = 0; j < ncols; j++) {
+                CY2(DTYPE1, i, j) = count[j] >= min_count ?
+                    MOVE_VALUE(asum[j], npos[j], nneg[j]) / count[j] :
+                    BN_NAN;
+            }
+        }
+        else {
+            #pragma omp simd
+            for (j = 0; j < ncols; j++) {
+                CY2(DTYPE1, i, j) = count[j] >= min_count ?
+                    MOVE_VALUE(asum[j], npos[j], nneg[j]) : BN_NAN;
+            }
+        }
+    }
+}
+/* dtype end */
+
+/* repeat = {'NAME': ['move', 'p_move'],
+             'PARALLEL': ['',
+                          '#pragma omp parallel for schedule(static)']} */
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static int
+NAME_DTYPE0(PyArrayObject *a, PyArrayObject *y, int axis, int fast_axis,
+            npy_intp window, npy_intp min_count, int mean)
+{
+    npy_intp its;
+    piter3 it;
+    if (!init_piter3(&it, a, y, axis, fast_axis)) return 0;
+    Py_BEGIN_ALLOW_THREADS
+    if (axis == fast_axis) {
+        PARALLEL
+        for (its = 0; its < it.nits; its++) {
+            move_slice_DTYPE0(it.ppa[its], it.ppy[its], it.length,
+                              it.astride, it.ystride, window, min_count,
+                              mean);
+        }
+    }
+    else {
+        const npy_intp nblocks = (it.fast_length + MOVE_COLS - 1) /
+                                 MOVE_COLS;
+        PARALLEL
+        for (its = 0; its < it.nits * nblocks; its++) {
+            const npy_intp j = (its % nblocks) * MOVE_COLS;
+            const npy_intp ncols = it.fast_length - j < MOVE_COLS ?
+                                   it.fast_length - j : MOVE_COLS;
+            move_rows_DTYPE0(it.ppa[its / nblocks] + j * it.fast_astride,
+                             it.ppy[its / nblocks] + j * it.fast_ystride,
+                             it.length, ncols, it.astride, it.ystride,
+                             it.fast_astride, it.fast_ystride, window,
+                             min_count, mean);
+        }
+    }
+    Py_END_ALLOW_THREADS
+    free(it.ppa);
+    return 1;
+}
+/* dtype end */
+/* repeat end */
+
+/* repeat = {'NAME': ['move_sum', 'p_move_sum', 'move_mean', 'p_move_mean'],
+             'KERNEL': ['move', 'p_move', 'move', 'p_move'],
+             'MEAN': ['0', '0', '1', '1']} */
+static PyObject *
+NAME(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    return mover(args,
+                 kwds,
+                 MEAN,
+                 KERNEL_float64,
+                 KERNEL_float32,
+                 KERNEL_int64,
+                 KERNEL_int32);
+}
+/* repeat end */
+
+/* sum_product, weighted_sum --------------------------------------------- */
+
+/* Sum of a * b along an axis without the temporary a * b: both inputs are
+ * read in one pass. Along the fast axis each slice is a dot product that
+ * uses four SSE accumulators, as sum11 does, when both inputs are
+ * contiguous and four scalar accumulators, as sum04 does, otherwise. Along
+ * a non-fast axis the products of a block of columns are accumulated a row
+ * at a time, so that p_ functions have independent blocks for each thread.
+ * weighted_sum passes its weights as b, a view with zero strides along the
+ * axes that the weights do not have. */
+
+/* number of columns in a block when reducing along a non-fast axis */
+#define SUMPROD_COLS 256
+
+#define CB(dtype, i) *(npy_##dtype *)(pb + (i) * bstride)
+
+/* dot product of n elements of two slices */
+
+/* dtype = [['float64', '__m128d', '_mm_loadu_pd', '_mm_add_pd', '_mm_mul_pd',
+             '_mm_storeu_pd', '2'],
+            ['float32', '__m128', '_mm_loadu_ps', '_mm_add_ps', '_mm_mul_ps',
+             '_mm_storeu_ps', '4']] */
+static BN_INLINE npy_DTYPE0
+dot_DTYPE0(char *pa, char *pb, npy_intp n, npy_intp astride,
+           npy_intp bstride)
+{
+    npy_intp i = 0;
+    npy_DTYPE0 sum = 0;
+    if (astride == sizeof(npy_DTYPE0) && bstride == sizeof(npy_DTYPE0) &&
+        n >= 4 * DTYPE6) {
+        const npy_DTYPE0 *ad = (npy_DTYPE0 *)pa;
+        const npy_DTYPE0 *bd = (npy_DTYPE0 *)pb;
+        npy_DTYPE0 v[DTYPE6];
+        npy_intp k;
+        DTYPE1 vsum0 = DTYPE4(DTYPE2(&ad[0]), DTYPE2(&bd[0]));
+        DTYPE1 vsum1 = DTYPE4(DTYPE2(&ad[DTYPE6]), DTYPE2(&bd[DTYPE6]));
+        DTYPE1 vsum2 = DTYPE4(DTYPE2(&ad[2 * DTYPE6]),
+                              DTYPE2(&bd[2 * DTYPE6]));
+        DTYPE1 vsum3 = DTYPE4(DTYPE2(&ad[3 * DTYPE6]),
+                              DTYPE2(&bd[3 * DTYPE6]));
+        for (i = 4 * DTYPE6; i + 4 * DTYPE6 <= n; i += 4 * DTYPE6) {
+            vsum0 = DTYPE3(vsum0, DTYPE4(DTYPE2(&ad[i]), DTYPE2(&bd[i])));
+            vsum1 = DTYPE3(vsum1, DTYPE4(DTYPE2(&ad[i + DTYPE6]),
+                                         DTYPE2(&bd[i + DTYPE6])));
+            vsum2 = DTYPE3(vsum2, DTYPE4(DTYPE2(&ad[i + 2 * DTYPE6]),
+                                         DTYPE2(&bd[i + 2 * DTYPE6])));
+            vsum3 = DTYPE3(vsum3, DTYPE4(DTYPE2(&ad[i + 3 * DTYPE6]),
+                                         DTYPE2(&bd[i + 3 * DTYPE6])));
+        }
+        vsum0 = DTYPE3(DTYPE3(vsum0, vsum1), DTYPE3(vsum2, vsum3));
+        DTYPE5(v, vsum0);
+        for (k = 0; k < DTYPE6; k++) {
+            sum += v[k];
+        }
+    }
+    else {
+        npy_DTYPE0 s[4] = {0, 0, 0, 0};
+        for (; i + 4 <= n; i += 4) {
+            s[0] += CA(DTYPE0, i) * CB(DTYPE0, i);
+            s[1] += CA(DTYPE0, i + 1) * CB(DTYPE0, i + 1);
+            s[2] += CA(DTYPE0, i + 2) * CB(DTYPE0, i + 2);
+            s[3] += CA(DTYPE0, i + 3) * CB(DTYPE0, i + 3);
+        }
+        sum = s[0] + s[1] + s[2] + s[3];
+    }
+    for (; i < n; i++) {
+        sum += CA(DTYPE0, i) * CB(DTYPE0, i);
+    }
+    return sum;
+}
+/* dtype end */
+
+/* dtype = [['int64'], ['int32']] */
+static BN_INLINE npy_DTYPE0
+dot_DTYPE0(char *pa, char *pb, npy_intp n, npy_intp astride,
+           npy_intp bstride)
+{
+    npy_intp i = 0;
+    npy_DTYPE0 s[4] = {0, 0, 0, 0};
+    for (; i + 4 <= n; i += 4) {
+        s[0] += CA(DTYPE0, i) * CB(DTYPE0, i);
+        s[1] += CA(DTYPE0, i + 1) * CB(DTYPE0, i + 1);
+        s[2] += CA(DTYPE0, i + 2) * CB(DTYPE0, i + 2);
+        s[3] += CA(DTYPE0, i + 3) * CB(DTYPE0, i + 3);
+    }
+    for (; i < n; i++) {
+        s[0] += CA(DTYPE0, i) * CB(DTYPE0, i);
+    }
+    return s[0] + s[1] + s[2] + s[3];
+}
+/* dtype end */
+
+/* y[j] = sum over i of a[i, j] * b[i, j] for a block of ncols columns */
+
+#define CB2(dtype, i, j) \
+    *(npy_##dtype *)(pb + (i) * bstride + (j) * fast_bstride)
+
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static BN_INLINE void
+dot_rows_DTYPE0(char *pa, char *pb, char *py, npy_intp length,
+                npy_intp ncols, npy_intp astride, npy_intp bstride,
+                npy_intp fast_astride, npy_intp fast_bstride,
+                npy_intp fast_ystride)
+{
+    npy_intp i, j;
+    npy_DTYPE0 s[SUMPROD_COLS];
+    for (j = 0; j < ncols; j++) {
+        s[j] = 0;
+    }
+    for (i = 0; i < length; i++) {
+        #pragma omp simd
+        for (j = 0; j < ncols; j++) {
+            s[j] += CA2(DTYPE0, i, j) * CB2(DTYPE0, i, j);
+        }
+    }
+    for (j = 0; j < ncols; j++) {
+        *(npy_DTYPE0 *)(py + j * fast_ystride) = s[j];
+    }
+}
+/* dtype end */
+
+/* repeat = {'NAME': ['sumprod', 'p_sumprod'],
+             'PARALLEL': ['',
+                          '#pragma omp parallel for schedule(static)']} */
+/* dtype = [['float64'], ['float32'], ['int64'], ['int32']] */
+static PyObject *
+NAME_DTYPE0(PyArrayObject *a, PyArrayObject *b, int axis, int fast_axis)
+{
+    int i, j;
+    npy_intp its;
+    piter4 it;
+    PyObject *y;
+    npy_intp shape[NPY_MAXDIMS];
+    const int ndim = PyArray_NDIM(a);
+    for (i = 0, j = 0; i < ndim; i++) {
+        if (i != axis) shape[j++] = PyArray_DIM(a, i);
+    }
+    y = PyArray_EMPTY(ndim - 1, shape, NPY_DTYPE0, 0);
+    if (y == NULL) return NULL;
+    if (!init_piter4(&it, a, b, (PyArrayObject *)y, axis, fast_axis)) {
+        Py_DECREF(y);
+        return NULL;
+    }
+    Py_BEGIN_ALLOW_THREADS
+    if (axis == fast_axis) {
+        PARALLEL
+        for (its = 0; its < it.nits; its++) {
+            *(npy_DTYPE0 *)it.ppy[its] = dot_DTYPE0(it.ppa[its], it.ppb[its],
+                                                    it.length, it.astride,
+                                                    it.bstride);
+        }
+    }
+    else {
+        const npy_intp nblocks = (it.fast_length + SUMPROD_COLS - 1) /
+                                 SUMPROD_COLS;
+        PARALLEL
+        for (its = 0; its < it.nits * nblocks; its++) {
+            const npy_intp k = (its % nblocks) * SUMPROD_COLS;
+            const npy_intp ncols = it.fast_length - k < SUMPROD_COLS ?
+                                   it.fast_length - k : SUMPROD_COLS;
+            dot_rows_DTYPE0(it.ppa[its / nblocks] + k * it.fast_astride,
+                            it.ppb[its / nblocks] + k * it.fast_bstride,
+                            it.ppy[its / nblocks] + k * it.fast_ystride,
+                            it.length, ncols, it.astride, it.bstride,
+                            it.fast_astride, it.fast_bstride,
+                            it.fast_ystride);
+        }
+    }
+    Py_END_ALLOW_THREADS
+    free(it.ppa);
+    return y;
+}
+/* dtype end */
+/* repeat end */
+
+/* repeat = {'NAME': ['sum_product', 'p_sum_product', 'weighted_sum',
+                      'p_weighted_sum'],
+             'KERNEL': ['sumprod', 'p_sumprod', 'sumprod', 'p_sumprod'],
+             'WEIGHTED': ['0', '0', '1', '1']} */
+static PyObject *
+NAME(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    return multiplier(args,
+                      kwds,
+                      WEIGHTED,
+                      KERNEL_float64,
+                      KERNEL_float32,
+                      KERNEL_int64,
+                      KERNEL_int32);
+}
+/* repeat end */
+
+/* sum_load -------------------------------------------------------------- */
+
+/* Sums of byte-swapped (e.g. big-endian data on a little-endian computer)
+ * and unaligned arrays. Such arrays are read in place, without a copy: each
+ * element is loaded with memcpy, or each 16 bytes with an unaligned SIMD
+ * load, and the bytes are swapped in registers (SSSE3 pshufb) before they
+ * are added. reducer and reducer02 send these arrays here whichever sum
+ * function was called; the p_ functions run the loops in parallel. */
+
+/* number of columns in a block when summing along a non-fast axis */
+#define SUMLOAD_COLS 256
+
+/* reverse the bytes of each 8 or 4 byte element of a 16 byte vector */
+#define SWAP64 _mm_set_epi8(8, 9, 10, 11, 12, 13, 14, 15, \
+                            0, 1, 2, 3, 4, 5, 6, 7)
+#define SWAP32 _mm_set_epi8(12, 13, 14, 15, 8, 9, 10, 11, \
+                            4, 5, 6, 7, 0, 1, 2, 3)
+
+#define AS_SI128(x) (x)
+
+static BN_INLINE __m128i
+loadu_swap(const char *p, const __m128i mask, int swapped)
+{
+    __m128i x = _mm_loadu_si128((const __m128i *)p);
+    return swapped ? _mm_shuffle_epi8(x, mask) : x;
+}
+
+/* dtype = [['float64', 'npy_uint64', '__builtin_bswap64'],
+            ['float32', 'npy_uint32', '__builtin_bswap32'],
+            ['int64', 'npy_uint64', '__builtin_bswap64'],
+            ['int32', 'npy_uint32', '__builtin_bswap32']] */
+static BN_INLINE npy_DTYPE0
+load_DTYPE0(const char *p, int swapped)
+{
+    npy_DTYPE0 v;
+    if (swapped) {
+        DTYPE1 u;
+        memcpy(&u, p, sizeof(u));
+        u = DTYPE2(u);
+        memcpy(&v, &u, sizeof(v));
+    }
+    else {
+        memcpy(&v, p, sizeof(v));
+    }
+    return v;
+}
+/* dtype end */
+
+/* dtype = [['float64', '__m128d', '_mm_castsi128_pd', '_mm_add_pd',
+             '_mm_storeu_pd', '_mm_setzero_pd', 'SWAP64', '2'],
+            ['float32', '__m128', '_mm_castsi128_ps', '_mm_add_ps',
+             '_mm_storeu_ps', '_mm_setzero_ps', 'SWAP32', '4'],
+            ['int64', '__m128i', 'AS_SI128', '_mm_add_epi64',
+             'STOREU_SI128', '_mm_setzero_si128', 'SWAP64', '2'],
+            ['int32', '__m128i', 'AS_SI128', '_mm_add_epi32',
+             'STOREU_SI128', '_mm_setzero_si128', 'SWAP32', '4']] */
+
+/* sum of one slice of n elements */
+static BN_INLINE npy_DTYPE0
+sumload_slice_DTYPE0(const char *pa, npy_intp n, npy_intp astride,
+                     int swapped)
+{
+    npy_intp i = 0;
+    npy_DTYPE0 sum = 0;
+    if (astride == sizeof(npy_DTYPE0)) {
+        const __m128i mask = DTYPE6;
+        const npy_intp w = DTYPE7 * sizeof(npy_DTYPE0);
+        npy_DTYPE0 v[DTYPE7];
+        npy_intp k;
+        DTYPE1 s0 = DTYPE5();
+        DTYPE1 s1 = DTYPE5();
+        DTYPE1 s2 = DTYPE5();
+        DTYPE1 s3 = DTYPE5();
+        for (; i + 4 * DTYPE7 <= n; i += 4 * DTYPE7) {
+            const char *p = pa + i * sizeof(npy_DTYPE0);
+            s0 = DTYPE3(s0, DTYPE2(loadu_swap(p, mask, swapped)));
+            s1 = DTYPE3(s1, DTYPE2(loadu_swap(p + w, mask, swapped)));
+            s2 = DTYPE3(s2, DTYPE2(loadu_swap(p + 2 * w, mask, swapped)));
+            s3 = DTYPE3(s3, DTYPE2(loadu_swap(p + 3 * w, mask, swapped)));
+        }
+        s0 = DTYPE3(DTYPE3(s0, s1), DTYPE3(s2, s3));
+        DTYPE4(v, s0);
+        for (k = 0; k < DTYPE7; k++) {
+            sum += v[k];
+        }
+    }
+    for (; i < n; i++) {
+        sum += load_DTYPE0(pa + i * astride, swapped);
+    }
+    return sum;
+}
+
+/* sums along axis of a block of ncols columns, a row at a time */
+static BN_INLINE void
+sumload_rows_DTYPE0(const char *pa, char *py, npy_intp length,
+                    npy_intp ncols, npy_intp astride, npy_intp fast_astride,
+                    npy_intp fast_ystride, int swapped)
+{
+    npy_intp i, j;
+    npy_DTYPE0 s[SUMLOAD_COLS];
+    for (j = 0; j < ncols; j++) {
+        s[j] = 0;
+    }
+    if (fast_astride == sizeof(npy_DTYPE0)) {
+        const __m128i mask = DTYPE6;
+        const npy_intp j_simd = ncols - ncols % DTYPE7;
+        DTYPE1 vs[SUMLOAD_COLS / DTYPE7];
+        for (j = 0; j < j_simd; j += DTYPE7) {
+            vs[j / DTYPE7] = DTYPE5();
+        }
+        for (i = 0; i < length; i++) {
+            const char *row = pa + i * astride;
+            for (j = 0; j < j_simd; j += DTYPE7) {
+                const char *p = row + j * sizeof(npy_DTYPE0);
+                vs[j / DTYPE7] = DTYPE3(vs[j / DTYPE7],
+                                        DTYPE2(loadu_swap(p, mask, swapped)));
+            }
+            for (; j < ncols; j++) {
+                s[j] += load_DTYPE0(row + j * sizeof(npy_DTYPE0), swapped);
+            }
+        }
+        for (j = 0; j < j_simd; j += DTYPE7) {
+            DTYPE4(&s[j], vs[j / DTYPE7]);
+        }
+    }
+    else {
+        for (i = 0; i < length; i++) {
+            for (j = 0; j < ncols; j++) {
+                s[j] += load_DTYPE0(pa + i * astride + j * fast_astride,
+                                    swapped);
+            }
+        }
+    }
+    for (j = 0; j < ncols; j++) {
+        *(npy_DTYPE0 *)(py + j * fast_ystride) = s[j];
+    }
+}
+
+static PyObject *
+sumload_DTYPE0(PyArrayObject *a, int axis, int fast_axis, int parallel)
+{
+    int i, j;
+    npy_intp its;
+    piter4 it;
+    PyObject *y;
+    npy_intp shape[NPY_MAXDIMS];
+    const int ndim = PyArray_NDIM(a);
+    const int swapped = PyArray_ISBYTESWAPPED(a);
+    for (i = 0, j = 0; i < ndim; i++) {
+        if (i != axis) shape[j++] = PyArray_DIM(a, i);
+    }
+    y = PyArray_EMPTY(ndim - 1, shape, NPY_DTYPE0, 0);
+    if (y == NULL) return NULL;
+    /* there is no second input; b is a */
+    if (!init_piter4(&it, a, a, (PyArrayObject *)y, axis, fast_axis)) {
+        Py_DECREF(y);
+        return NULL;
+    }
+    Py_BEGIN_ALLOW_THREADS
+    if (axis == fast_axis) {
+        #pragma omp parallel for schedule(static) if (parallel)
+        for (its = 0; its < it.nits; its++) {
+            *(npy_DTYPE0 *)it.ppy[its] = sumload_slice_DTYPE0(it.ppa[its],
+                                                              it.length,
+                                                              it.astride,
+                                                              swapped);
         }
-        if (ndim == 1) {
-            VALUE_ERR("ndim must be > 1");
+    }
+    else {
+        const npy_intp nblocks = (it.fast_length + SUMLOAD_COLS - 1) /
+                                 SUMLOAD_COLS;
+        #pragma omp parallel for schedule(static) if (parallel)
+        for (its = 0; its < it.nits * nblocks; its++) {
+            const npy_intp k = (its % nblocks) * SUMLOAD_COLS;
+            const npy_intp ncols = it.fast_length - k < SUMLOAD_COLS ?
+                                   it.fast_length - k : SUMLOAD_COLS;
+            sumload_rows_DTYPE0(it.ppa[its / nblocks] + k * it.fast_astride,
+                                it.ppy[its / nblocks] + k * it.fast_ystride,
+                                it.length, ncols, it.astride,
+                                it.fast_astride, it.fast_ystride, swapped);
+        }
+    }
+    Py_END_ALLOW_THREADS
+    free(it.ppa);
+    return y;
+}
+/* dtype end */
+
+/* sum of a byte-swapped or unaligned array of a supported dtype */
+static PyObject *
+sumload(PyArrayObject *a, int axis, int fast_axis, int parallel)
+{
+    switch (PyArray_TYPE(a)) {
+        case NPY_FLOAT64: return sumload_float64(a, axis, fast_axis, parallel);
+        case NPY_FLOAT32: return sumload_float32(a, axis, fast_axis, parallel);
+        case NPY_INT64: return sumload_int64(a, axis, fast_axis, parallel);
+        default: return sumload_int32(a, axis, fast_axis, parallel);
+    }
+}
+
+/* python strings -------------------------------------------------------- */
+
+PyObject *pystr_a = NULL;
+PyObject *pystr_axis = NULL;
+
+static int
+intern_strings(void) {
+    pystr_a = PyString_InternFromString("a");
+    pystr_axis = PyString_InternFromString("axis");
+    return pystr_a && pystr_axis;
+}
+
+/* reducer --------------------------------------------------------------- */
+
+static BN_INLINE int
+parse_args(PyObject *args,
+           PyObject *kwds,
+           PyObject **a,
+           PyObject **axis)
+{
+    const Py_ssize_t nargs = PyTuple_GET_SIZE(args);
+    const Py_ssize_t nkwds = kwds == NULL ? 0 : PyDict_Size(kwds);
+    if (nkwds) {
+        int nkwds_found = 0;
+        PyObject *tmp;
+        switch (nargs) {
+            case 1: *a = PyTuple_GET_ITEM(args, 0);
+            case 0: break;
+            default:
+                TYPE_ERR("wrong number of arguments");
+                return 0;
+        }
+        switch (nargs) {
+            case 0:
+                *a = PyDict_GetItem(kwds, pystr_a);
+                if (*a == NULL) {
+                    TYPE_ERR("Cannot find `a` keyword input");
+                    return 0;
+                }
+                nkwds_found += 1;
+            case 1:
+                tmp = PyDict_GetItem(kwds, pystr_axis);
+                if (tmp != NULL) {
+                    *axis = tmp;
+                    nkwds_found++;
+                }
+                break;
+            default:
+                TYPE_ERR("wrong number of arguments");
+                return 0;
+        }
+        if (nkwds_found != nkwds) {
+            TYPE_ERR("wrong number of keyword arguments");
+            return 0;
+        }
+        if (nargs + nkwds_found > 2) {
+            TYPE_ERR("too many arguments");
+            return 0;
+        }
+    }
+    else {
+        switch (nargs) {
+            case 2:
+                *axis = PyTuple_GET_ITEM(args, 1);
+            case 1:
+                *a = PyTuple_GET_ITEM(args, 0);
+                break;
+            default:
+                TYPE_ERR("wrong number of arguments");
+                return 0;
+        }
+    }
+
+    return 1;
+
+}
+
+/* axis with the smallest stride */
+static int
+find_fast_axis(PyArrayObject *a)
+{
+    int i, fast_axis = 0;
+    const int ndim = PyArray_NDIM(a);
+    const npy_intp *strides = PyArray_STRIDES(a);
+    npy_intp min_stride;
+    if (C_CONTIGUOUS(a)) {
+        return ndim - 1;
+    }
+    else if (F_CONTIGUOUS(a)) {
+        return 0;
+    }
+    min_stride = strides[0];
+    for (i = 1; i < ndim; i++) {
+        if (strides[i] < min_stride) {
+            min_stride = strides[i];
+            fast_axis = i;
+        }
+    }
+    return fast_axis;
+}
+
+/* axis, from an integer or, if not given (NULL), the last axis; returns 0
+ * and sets an exception if axis is None or out of bounds */
+static int
+parse_axis(PyObject *axis_obj, int ndim, int *axis)
+{
+    if (axis_obj == Py_None) {
+        VALUE_ERR("`axis` cannot be None");
+        return 0;
+    }
+    else if (axis_obj == NULL) {
+        *axis = ndim - 1;
+        return 1;
+    }
+    *axis = PyArray_PyIntAsInt(axis_obj);
+    if (error_converting(*axis)) {
+        TYPE_ERR("`axis` must be an integer");
+        return 0;
+    }
+    if (*axis < -ndim || *axis >= ndim) {
+        PyErr_Format(PyExc_ValueError, "axis(=%d) out of bounds", *axis);
+        return 0;
+    }
+    if (*axis < 0) {
+        *axis += ndim;
+    }
+    return 1;
+}
+
+/* new reference to obj as an array; objects that support the buffer
+ * protocol, including bytes and read-only buffers, are used without a
+ * copy */
+static PyArrayObject *
+as_array(PyObject *obj)
+{
+    PyObject *a;
+    if (PyArray_Check(obj)) {
+        Py_INCREF(obj);
+        return (PyArrayObject *)obj;
+    }
+    if (PyObject_CheckBuffer(obj)) {
+        PyObject *view = PyMemoryView_FromObject(obj);
+        if (view == NULL) {
             return NULL;
         }
+        a = PyArray_FROM_O(view);
+        Py_DECREF(view);
+        return (PyArrayObject *)a;
+    }
+    return (PyArrayObject *)PyArray_FROM_O(obj);
+}
+
+static PyObject *
+reducer(PyObject *args,
+        PyObject *kwds,
+        int parallel,
+        fone_t f_float64,
+        fone_t f_float32,
+        fone_t f_int64,
+        fone_t f_int32)
+{
+
+    int ndim;
+    int axis;
+    int dtype;
+
+    PyArrayObject *a;
+    PyObject *y;
+
+    PyObject *a_obj = NULL;
+    PyObject *axis_obj = NULL;
+
+    if (!parse_args(args, kwds, &a_obj, &axis_obj)) return NULL;
+
+    /* convert to array if necessary */
+    a = as_array(a_obj);
+    if (a == NULL) {
+        return NULL;
+    }
+
+    /* we reduce an array with ndim > 1 over a single axis */
+    ndim = PyArray_NDIM(a);
+    if (!parse_axis(axis_obj, ndim, &axis)) {
+        Py_DECREF(a);
+        return NULL;
+    }
+    if (ndim < 2) {
+        Py_DECREF(a);
+        VALUE_ERR("ndim must be > 1");
+        return NULL;
+    }
+
+    dtype = PyArray_TYPE(a);
+
+    if (dtype != NPY_FLOAT64 && dtype != NPY_FLOAT32 &&
+        dtype != NPY_INT64 && dtype != NPY_INT32) {
+        y = PyArray_Sum(a, axis, dtype, NULL);
+    }
+    else if (PyArray_ISBYTESWAPPED(a) || !PyArray_ISALIGNED(a)) {
+        y = sumload(a, axis, find_fast_axis(a), parallel);
+    }
+    else if (dtype == NPY_FLOAT64) {
+        y = f_float64(a, axis);
+    }
+    else if (dtype == NPY_FLOAT32) {
+        y = f_float32(a, axis);
+    }
+    else if (dtype == NPY_INT64) {
+        y = f_int64(a, axis);
+    }
+    else {
+        y = f_int32(a, axis);
+    }
+
+    Py_DECREF(a);
+    return y;
+
+}
+
+static PyObject *
+reducer02(PyObject *args,
+          PyObject *kwds,
+          int parallel,
+          fnf_t f_float64,
+          fnf_t f_float32,
+          fnf_t f_int64,
+          fnf_t f_int32)
+{
+
+    int ndim;
+    int axis;
+    int dtype;
+    int fast_axis;
+
+    PyArrayObject *a;
+    PyObject *y;
+
+    PyObject *a_obj = NULL;
+    PyObject *axis_obj = NULL;
+
+    if (!parse_args(args, kwds, &a_obj, &axis_obj)) return NULL;
+
+    /* convert to array if necessary */
+    a = as_array(a_obj);
+    if (a == NULL) {
+        return NULL;
+    }
+
+    /* we reduce an array with ndim > 1 over a single axis */
+    ndim = PyArray_NDIM(a);
+    if (!parse_axis(axis_obj, ndim, &axis)) {
+        Py_DECREF(a);
+        return NULL;
+    }
+    if (ndim < 2) {
+        Py_DECREF(a);
+        VALUE_ERR("ndim must be > 1");
+        return NULL;
+    }
+
+    fast_axis = find_fast_axis(a);
+
+    dtype = PyArray_TYPE(a);
+
+    if (dtype != NPY_FLOAT64 && dtype != NPY_FLOAT32 &&
+        dtype != NPY_INT64 && dtype != NPY_INT32) {
+        y = PyArray_Sum(a, axis, dtype, NULL);
+    }
+    else if (PyArray_ISBYTESWAPPED(a) || !PyArray_ISALIGNED(a)) {
+        y = sumload(a, axis, fast_axis, parallel);
+    }
+    else if (dtype == NPY_FLOAT64) {
+        y = f_float64(a, axis, fast_axis);
+    }
+    else if (dtype == NPY_FLOAT32) {
+        y = f_float32(a, axis, fast_axis);
+    }
+    else if (dtype == NPY_INT64) {
+        y = f_int64(a, axis, fast_axis);
+    }
+    else {
+        y = f_int32(a, axis, fast_axis);
+    }
+
+    Py_DECREF(a);
+    return y;
+
+}
+
+/* cumsummer ------------------------------------------------------------- */
+
+static PyObject *
+cumsummer(PyObject *args,
+          PyObject *kwds,
+          fcum_t f_float64,
+          fcum_t f_float32,
+          fcum_t f_int64,
+          fcum_t f_int32)
+{
+
+    int i, ndim, axis, dtype, rtype, ok;
+    fcum_t f;
+
+    PyArrayObject *a;
+    PyArrayObject *y;
+
+    PyObject *a_obj = NULL;
+    PyObject *axis_obj = NULL;
+    PyObject *out_obj = Py_None;
+
+    static char *kwlist[] = {"a", "axis", "out", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|OO", kwlist, &a_obj,
+                                     &axis_obj, &out_obj)) {
+        return NULL;
+    }
+
+    a = as_array(a_obj);
+    if (a == NULL) {
+        return NULL;
+    }
+
+    ndim = PyArray_NDIM(a);
+    if (ndim < 2) {
+        Py_DECREF(a);
+        VALUE_ERR("ndim must be > 1");
+        return NULL;
+    }
+    if (!parse_axis(axis_obj, ndim, &axis)) {
+        Py_DECREF(a);
+        return NULL;
     }
 
     dtype = PyArray_TYPE(a);
-
-    /* we are reducing an array with ndim > 1 over a single axis */
     if (dtype == NPY_FLOAT64) {
-        return f_float64(a, axis);
+        f = f_float64;
     }
     else if (dtype == NPY_FLOAT32) {
-        return f_float32(a, axis);
+        f = f_float32;
     }
     else if (dtype == NPY_INT64) {
-        return f_int64(a, axis);
+        f = f_int64;
     }
     else if (dtype == NPY_INT32) {
-        return f_int32(a, axis);
+        f = f_int32;
+    }
+    else {
+        f = NULL;
+    }
+    /* the other dtypes are left to numpy, which upcasts bool and small
+     * integers to its default accumulator */
+    rtype = f == NULL ? NPY_NOTYPE : dtype;
+
+    if (out_obj == Py_None) {
+        if (f == NULL || PyArray_ISBYTESWAPPED(a) || !PyArray_ISALIGNED(a)) {
+            y = (PyArrayObject *)PyArray_CumSum(a, axis, rtype, NULL);
+            Py_DECREF(a);
+            return (PyObject *)y;
+        }
+        y = (PyArrayObject *)PyArray_EMPTY(ndim, PyArray_SHAPE(a), dtype,
+                                           F_CONTIGUOUS(a) &&
+                                           !C_CONTIGUOUS(a));
+        if (y == NULL) {
+            Py_DECREF(a);
+            return NULL;
+        }
     }
     else {
-        return PyArray_Sum(a, axis, dtype, NULL);
+        if (!PyArray_Check(out_obj)) {
+            Py_DECREF(a);
+            TYPE_ERR("`out` must be an array");
+            return NULL;
+        }
+        y = (PyArrayObject *)out_obj;
+        ok = PyArray_NDIM(y) == ndim &&
+             (f == NULL || PyArray_TYPE(y) == dtype);
+        for (i = 0; ok && i < ndim; i++) {
+            ok = PyArray_DIM(y, i) == PyArray_DIM(a, i);
+        }
+        if (!ok) {
+            Py_DECREF(a);
+            VALUE_ERR("`out` must have the shape and dtype of `a`");
+            return NULL;
+        }
+        if (!PyArray_ISWRITEABLE(y)) {
+            Py_DECREF(a);
+            VALUE_ERR("`out` is not writeable");
+            return NULL;
+        }
+        if (f == NULL || PyArray_ISBYTESWAPPED(a) || !PyArray_ISALIGNED(a) ||
+            PyArray_ISBYTESWAPPED(y) || !PyArray_ISALIGNED(y)) {
+            y = (PyArrayObject *)PyArray_CumSum(a, axis, rtype, y);
+            Py_DECREF(a);
+            return (PyObject *)y;
+        }
+        Py_INCREF(y);
+    }
+
+    ok = f(a, y, axis, find_fast_axis(a));
+    Py_DECREF(a);
+    if (!ok) {
+        Py_DECREF(y);
+        return NULL;
     }
+    return (PyObject *)y;
 
 }
 
+/* mover ----------------------------------------------------------------- */
+
 static PyObject *
-reducer02(PyObject *args,
-          PyObject *kwds,
-          fnf_t f_float64,
-          fnf_t f_float32,
-          fnf_t f_int64,
-          fnf_t f_int32)
+mover(PyObject *args,
+      PyObject *kwds,
+      int mean,
+      fmove_t f_float64,
+      fmove_t f_float32,
+      fmove_t f_int64,
+      fmove_t f_int32)
 {
 
-    int ndim;
-    int axis;
-    int dtype;
-    int fast_axis;
+    int ndim, axis, dtype, ok;
+    npy_intp window, min_count, length;
+    fmove_t f;
 
     PyArrayObject *a;
+    PyArrayObject *y;
 
     PyObject *a_obj = NULL;
+    PyObject *window_obj = NULL;
     PyObject *axis_obj = NULL;
+    PyObject *min_count_obj = Py_None;
 
-    if (!parse_args(args, kwds, &a_obj, &axis_obj)) return NULL;
+    static char *kwlist[] = {"a", "window", "axis", "min_count", NULL};
 
-    /* convert to array if necessary */
-    if PyArray_Check(a_obj) {
-        a = (PyArrayObject *)a_obj;
-    } else {
-        a = (PyArrayObject *)PyArray_FROM_O(a_obj);
-        if (a == NULL) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|OO", kwlist, &a_obj,
+                                     &window_obj, &axis_obj,
+                                     &min_count_obj)) {
+        return NULL;
+    }
+
+    a = as_array(a_obj);
+    if (a == NULL) {
+        return NULL;
+    }
+
+    /* other dtypes, and byte-swapped or unaligned input, are copied */
+    dtype = PyArray_TYPE(a);
+    if (dtype != NPY_FLOAT64 && dtype != NPY_FLOAT32 &&
+        dtype != NPY_INT64 && dtype != NPY_INT32) {
+        dtype = NPY_FLOAT64;
+    }
+    if (dtype != PyArray_TYPE(a) || PyArray_ISBYTESWAPPED(a) ||
+        !PyArray_ISALIGNED(a)) {
+        PyArrayObject *b = (PyArrayObject *)PyArray_FROM_OTF((PyObject *)a,
+                                                dtype, NPY_ARRAY_ALIGNED);
+        Py_DECREF(a);
+        if (b == NULL) {
             return NULL;
         }
+        a = b;
     }
 
-    /* check for byte swapped input array */
-    if PyArray_ISBYTESWAPPED(a) {
-        VALUE_ERR("Byte-swapped arrays are not supported");
+    ndim = PyArray_NDIM(a);
+    if (ndim < 2) {
+        Py_DECREF(a);
+        VALUE_ERR("ndim must be > 1");
+        return NULL;
+    }
+    if (!parse_axis(axis_obj, ndim, &axis)) {
+        Py_DECREF(a);
         return NULL;
     }
 
-    /* does user want to reduce over all axes? */
-    ndim = PyArray_NDIM(a);
-    if (axis_obj == Py_None) {
-        VALUE_ERR("`axis` cannot be None");
+    length = PyArray_DIM(a, axis);
+    window = PyArray_PyIntAsIntp(window_obj);
+    if (error_converting(window)) {
+        Py_DECREF(a);
+        TYPE_ERR("`window` must be an integer");
         return NULL;
     }
-    else if (axis_obj == NULL) {
-        if (ndim < 2) {
-            VALUE_ERR("ndim must be > 1");
-            return NULL;
-        }
-        axis = PyArray_NDIM(a) - 1;
+    if (window < 1 || window > length) {
+        Py_DECREF(a);
+        PyErr_Format(PyExc_ValueError,
+                     "Moving window (=%zd) must be between 1 and %zd, inclusive",
+                     (Py_ssize_t)window, (Py_ssize_t)length);
+        return NULL;
+    }
+    if (min_count_obj == Py_None) {
+        min_count = window;
     }
     else {
-        axis = PyArray_PyIntAsInt(axis_obj);
-        if (error_converting(axis)) {
-            TYPE_ERR("`axis` must be an integer or None");
-            return NULL;
-        }
-        if (axis < 0) {
-            axis += ndim;
-            if (axis < 0) {
-                PyErr_Format(PyExc_ValueError,
-                             "axis(=%d) out of bounds", axis);
-                return NULL;
-            }
-        }
-        else if (axis >= ndim) {
-            PyErr_Format(PyExc_ValueError, "axis(=%d) out of bounds", axis);
+        min_count = PyArray_PyIntAsIntp(min_count_obj);
+        if (error_converting(min_count)) {
+            Py_DECREF(a);
+            TYPE_ERR("`min_count` must be an integer");
             return NULL;
         }
-        if (ndim == 1) {
-            VALUE_ERR("ndim must be > 1");
+        if (min_count < 1 || min_count > window) {
+            Py_DECREF(a);
+            PyErr_Format(PyExc_ValueError,
+                         "min_count (=%zd) must be between 1 and %zd, "
+                         "inclusive", (Py_ssize_t)min_count,
+                         (Py_ssize_t)window);
             return NULL;
         }
     }
 
-    if (C_CONTIGUOUS(a)) {
-        fast_axis = ndim - 1;
+    if (dtype == NPY_FLOAT64) {
+        f = f_float64;
     }
-    else if (F_CONTIGUOUS(a)) {
-        fast_axis = 0;
+    else if (dtype == NPY_FLOAT32) {
+        f = f_float32;
+    }
+    else if (dtype == NPY_INT64) {
+        f = f_int64;
+        dtype = NPY_FLOAT64;
     }
     else {
-        int i;
-        fast_axis = 0;
-        npy_intp *strides = PyArray_STRIDES(a);
-        npy_intp min_stride = strides[0];
-        for (i = 1; i < ndim; i++) {
-            if (strides[i] < min_stride) {
-                min_stride = strides[i];
-                fast_axis = i;
-            }
-        }
+        f = f_int32;
+        dtype = NPY_FLOAT64;
     }
 
-    dtype = PyArray_TYPE(a);
+    y = (PyArrayObject *)PyArray_EMPTY(ndim, PyArray_SHAPE(a), dtype,
+                                       F_CONTIGUOUS(a) && !C_CONTIGUOUS(a));
+    if (y == NULL) {
+        Py_DECREF(a);
+        return NULL;
+    }
+
+    ok = f(a, y, axis, find_fast_axis(a), window, min_count, mean);
+    Py_DECREF(a);
+    if (!ok) {
+        Py_DECREF(y);
+        return NULL;
+    }
+    return (PyObject *)y;
+
+}
+
+/* multiplier ------------------------------------------------------------ */
+
+static PyObject *
+multiplier(PyObject *args,
+           PyObject *kwds,
+           int weighted,
+           fsp_t f_float64,
+           fsp_t f_float32,
+           fsp_t f_int64,
+           fsp_t f_int32)
+{
+
+    int i, j, ndim, axis, dtype, ok;
+    npy_intp strides[NPY_MAXDIMS];
+    fsp_t f;
 
+    PyArrayObject *a;
+    PyArrayObject *b;
+    PyArrayObject *w;
+    PyArrayObject *arrs[2];
+    PyArray_Descr *descr;
+    PyObject *y;
+
+    PyObject *a_obj = NULL;
+    PyObject *b_obj = NULL;
+    PyObject *axis_obj = NULL;
+
+    static char *kwlist[] = {"a", "b", "axis", NULL};
+    static char *kwlist_w[] = {"a", "w", "axis", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|O",
+                                     weighted ? kwlist_w : kwlist, &a_obj,
+                                     &b_obj, &axis_obj)) {
+        return NULL;
+    }
+
+    a = as_array(a_obj);
+    if (a == NULL) {
+        return NULL;
+    }
+    w = as_array(b_obj);
+    if (w == NULL) {
+        Py_DECREF(a);
+        return NULL;
+    }
+
+    /* inputs of supported dtypes are cast to their common dtype, aligned
+     * and in native byte order; others are left to numpy */
+    arrs[0] = a;
+    arrs[1] = w;
+    descr = PyArray_ResultType(2, arrs, 0, NULL);
+    if (descr == NULL) {
+        Py_DECREF(a);
+        Py_DECREF(w);
+        return NULL;
+    }
+    dtype = descr->type_num;
+    Py_DECREF(descr);
     if (dtype == NPY_FLOAT64) {
-        return f_float64(a, axis, fast_axis);
+        f = f_float64;
     }
     else if (dtype == NPY_FLOAT32) {
-        return f_float32(a, axis, fast_axis);
+        f = f_float32;
     }
     else if (dtype == NPY_INT64) {
-        return f_int64(a, axis, fast_axis);
+        f = f_int64;
     }
     else if (dtype == NPY_INT32) {
-        return f_int32(a, axis, fast_axis);
+        f = f_int32;
+    }
+    else {
+        f = NULL;
+    }
+    for (i = 0; f != NULL && i < 2; i++) {
+        if (PyArray_TYPE(arrs[i]) != dtype ||
+            PyArray_ISBYTESWAPPED(arrs[i]) || !PyArray_ISALIGNED(arrs[i])) {
+            PyArrayObject *c = (PyArrayObject *)PyArray_FROM_OTF(
+                                    (PyObject *)arrs[i], dtype,
+                                    NPY_ARRAY_ALIGNED);
+            Py_DECREF(arrs[i]);
+            arrs[i] = c;
+        }
+    }
+    a = arrs[0];
+    w = arrs[1];
+    if (a == NULL || w == NULL) {
+        Py_XDECREF(a);
+        Py_XDECREF(w);
+        return NULL;
+    }
+
+    ndim = PyArray_NDIM(a);
+    if (ndim < 2) {
+        Py_DECREF(a);
+        Py_DECREF(w);
+        VALUE_ERR("ndim must be > 1");
+        return NULL;
+    }
+    if (!parse_axis(axis_obj, ndim, &axis)) {
+        Py_DECREF(a);
+        Py_DECREF(w);
+        return NULL;
+    }
+
+    if (!weighted) {
+        ok = PyArray_NDIM(w) == ndim;
+        for (i = 0; ok && i < ndim; i++) {
+            ok = PyArray_DIM(w, i) == PyArray_DIM(a, i);
+        }
+        if (!ok) {
+            Py_DECREF(a);
+            Py_DECREF(w);
+            VALUE_ERR("`a` and `b` must have the same shape");
+            return NULL;
+        }
+        b = w;
+    }
+    else {
+        /* weights along axis take precedence over weights of the output */
+        if (PyArray_NDIM(w) == 1 &&
+            PyArray_DIM(w, 0) == PyArray_DIM(a, axis)) {
+            for (i = 0; i < ndim; i++) {
+                strides[i] = 0;
+            }
+            strides[axis] = PyArray_STRIDE(w, 0);
+            ok = 1;
+        }
+        else {
+            /* weights of the output, broadcast as in numpy to the shape of
+             * a with axis removed */
+            const int offset = ndim - 1 - PyArray_NDIM(w);
+            ok = offset >= 0;
+            for (i = 0, j = 0; ok && i < ndim; i++) {
+                npy_intp wdim;
+                strides[i] = 0;
+                if (i == axis) continue;
+                if (j++ < offset) continue;
+                wdim = PyArray_DIM(w, j - 1 - offset);
+                ok = wdim == PyArray_DIM(a, i) || wdim == 1;
+                if (wdim != 1) {
+                    strides[i] = PyArray_STRIDE(w, j - 1 - offset);
+                }
+            }
+        }
+        if (!ok) {
+            Py_DECREF(a);
+            Py_DECREF(w);
+            VALUE_ERR("`w` must be 1d with length a.shape[axis] or "
+                      "broadcast to the shape of a with axis removed");
+            return NULL;
+        }
+        Py_INCREF(PyArray_DESCR(w));
+        b = (PyArrayObject *)PyArray_NewFromDescr(&PyArray_Type,
+                                                  PyArray_DESCR(w), ndim,
+                                                  PyArray_SHAPE(a), strides,
+                                                  PyArray_DATA(w), 0, NULL);
+        if (b == NULL) {
+            Py_DECREF(a);
+            Py_DECREF(w);
+            return NULL;
+        }
+        /* steals the reference to w */
+        if (PyArray_SetBaseObject(b, (PyObject *)w) < 0) {
+            Py_DECREF(a);
+            Py_DECREF(b);
+            return NULL;
+        }
+    }
+
+    if (f == NULL) {
+        PyObject *ab = PyNumber_Multiply((PyObject *)a, (PyObject *)b);
+        y = NULL;
+        if (ab != NULL) {
+            y = PyArray_Sum((PyArrayObject *)ab, axis, NPY_NOTYPE, NULL);
+            Py_DECREF(ab);
+        }
     }
     else {
-        return PyArray_Sum(a, axis, dtype, NULL);
+        y = f(a, b, axis, find_fast_axis(a));
     }
+    Py_DECREF(a);
+    Py_DECREF(b);
+    return y;
 
 }
 
@@ -1592,6 +3356,12 @@ If positive or negative infinity are present the result is positive or
 negative infinity. But if both positive and negative infinity are present,
 the result is Not A Number (NaN).
 
+Input that is byte-swapped or not aligned is not summed by the algorithm
+of the function called: every sum function (sum00 to sum13) hands it to
+one shared kernel that swaps the bytes and loads them unaligned as it
+adds, without a copy. The p_ functions run that kernel on their OpenMP
+threads. Timings of such input therefore do not compare the functions.
+
 Examples
 --------
 
@@ -1601,6 +3371,268 @@ array([ 4,  6])
 
 MULTILINE STRING END */
 
+static char numa_pin_doc[] =
+    "_numa_pin(cpus) -> run len(cpus) threads; pin thread i to cpus[i].";
+
+static char numa_unpin_doc[] =
+    "Undo _numa_pin: restore cpu affinity and number of OpenMP threads.";
+
+static char numa_set_doc[] =
+    "_numa_set(flag) -> switch numa mode (first touch by owner) on or off.";
+
+static char numa_get_doc[] = "True if numa mode is on.";
+
+static char numa_touch_doc[] =
+    "_numa_touch(a) -> zero C contiguous `a` in per-thread static chunks.";
+
+static char sum13_variants_doc[] =
+    "List of (name, unroll, nacc, cutoff) of the sum13 variants.";
+
+static char sum13_get_doc[] =
+    "_sum13_get(parallel) -> name of variant used by sum13 or p_sum13.";
+
+static char sum13_set_doc[] =
+    "_sum13_set(name, parallel) -> use variant `name` in sum13 or p_sum13.";
+
+static char cumsum_doc[] =
+/* MULTILINE STRING BEGIN
+cumsum(a, axis=-1, out=None)
+
+Cumulative sum of array elements along given axis. a.dim must be greater
+than 1.
+
+For float64, float32, int64 and int32 input the data type (dtype) of the
+output is the same as the input. Unlike NumPy, on 64-bit operating
+systems 32-bit integer input is NOT upcast to 64-bit accumulator and
+return values. Other dtypes are passed to np.cumsum, which upcasts bool
+and small integers.
+
+Parameters
+----------
+a : array_like
+    Input array. If `a` is not an array, a conversion is attempted.
+axis : int, optional
+    Axis along which the cumulative sum is computed. The default (axis=-1)
+    is to compute the cumulative sum along the last axis.
+out : ndarray, optional
+    Array, with the shape and dtype of `a`, in which to place the result.
+    It may be `a` itself but must not otherwise overlap `a`. For the dtypes
+    passed to np.cumsum it follows the rules of np.cumsum's `out`.
+
+Returns
+-------
+y : ndarray
+    An array with the same shape as `a`; `out` if given.
+
+Notes
+-----
+No error is raised on overflow.
+
+The p_ version (p_cumsum) scans along the fast axis of a few long slices
+in two passes: each thread sums its block of the slice and then scans its
+block starting from the sum of the blocks before it. The result may then
+differ from the single-threaded result by round-off.
+
+Examples
+--------
+
+>>> a = np.array([[1, 2], [3, 4]])
+>>> ss.cumsum(a, axis=0)
+array([[1, 2],
+       [4, 6]])
+
+MULTILINE STRING END */
+
+static char move_sum_doc[] =
+/* MULTILINE STRING BEGIN
+move_sum(a, window, axis=-1, min_count=None)
+
+Moving window sum along the specified axis, optionally ignoring NaNs.
+a.ndim must be greater than 1.
+
+Each output is the previous output plus the element entering the window
+minus the element leaving it, so the time per element does not depend on
+the window length.
+
+Parameters
+----------
+a : array_like
+    Input array. If `a` is not an array, a conversion is attempted.
+window : int
+    The number of elements in the moving window.
+axis : int, optional
+    The axis over which the window is moved. By default the last axis
+    (axis=-1) is used.
+min_count : {int, None}, optional
+    If the number of non-NaN values in a window is less than `min_count`,
+    then a value of NaN is assigned to the window. By default `min_count`
+    is None, which is equivalent to setting `min_count` equal to `window`.
+
+Returns
+-------
+y : ndarray
+    The moving sum of the input array along the specified axis. The output
+    has the same shape as the input. The dtype is float64 for integer
+    input and float32 for float32 input.
+
+Notes
+-----
+Because the sum is updated rather than recomputed, round-off may
+accumulate along long axes. Infinities are counted rather than added, so
+a window is inf, -inf, or NaN (when it holds both) only while they are in
+it, as with a sum of the window.
+
+The p_ version (p_move_sum) shares the slices, or blocks of columns when
+moving along a non-fast axis, among the OpenMP threads.
+
+Examples
+--------
+>>> a = np.array([[1.0, 2.0, 3.0, np.nan, 5.0]])
+>>> ss.move_sum(a, window=2)
+array([[ nan,   3.,   5.,  nan,  nan]])
+>>> ss.move_sum(a, window=2, min_count=1)
+array([[ 1.,  3.,  5.,  3.,  5.]])
+
+MULTILINE STRING END */
+
+static char move_mean_doc[] =
+/* MULTILINE STRING BEGIN
+move_mean(a, window, axis=-1, min_count=None)
+
+Moving window mean along the specified axis, optionally ignoring NaNs.
+a.ndim must be greater than 1.
+
+The mean of each window is its moving sum, see move_sum, divided by the
+number of non-NaN values in the window.
+
+Parameters
+----------
+a : array_like
+    Input array. If `a` is not an array, a conversion is attempted.
+window : int
+    The number of elements in the moving window.
+axis : int, optional
+    The axis over which the window is moved. By default the last axis
+    (axis=-1) is used.
+min_count : {int, None}, optional
+    If the number of non-NaN values in a window is less than `min_count`,
+    then a value of NaN is assigned to the window. By default `min_count`
+    is None, which is equivalent to setting `min_count` equal to `window`.
+
+Returns
+-------
+y : ndarray
+    The moving mean of the input array along the specified axis. The
+    output has the same shape as the input. The dtype is float64 for
+    integer input and float32 for float32 input.
+
+Examples
+--------
+>>> a = np.array([[1.0, 2.0, 3.0, np.nan, 5.0]])
+>>> ss.move_mean(a, window=2)
+array([[ nan,  1.5,  2.5,  nan,  nan]])
+>>> ss.move_mean(a, window=2, min_count=1)
+array([[ 1. ,  1.5,  2.5,  3. ,  5. ]])
+
+MULTILINE STRING END */
+
+static char sum_product_doc[] =
+/* MULTILINE STRING BEGIN
+sum_product(a, b, axis=-1)
+
+Sum of the product of two arrays along the specified axis. a.ndim must be
+greater than 1.
+
+Gives the result of (a * b).sum(axis) without creating the temporary
+array a * b, so each input is read once.
+
+Parameters
+----------
+a : array_like
+    Input array. If `a` is not an array, a conversion is attempted.
+b : array_like
+    Input array with the same shape as `a`.
+axis : int, optional
+    Axis along which the sum is computed. The default (axis=-1) is to sum
+    along the last axis.
+
+Returns
+-------
+y : ndarray
+    An array with the same shape as `a`, with the specified axis removed.
+    If `a` and `b` have different dtypes then both are cast to their common
+    dtype first.
+
+Notes
+-----
+No error is raised on overflow.
+
+An input whose dtype is not the common dtype, or that is byte-swapped or
+not aligned, is first copied to a temporary array of its size, which is
+the allocation this function otherwise avoids. Pass inputs of the same
+dtype in native byte order to sum them in place.
+
+The p_ version (p_sum_product) shares the slices, or blocks of columns
+when summing along a non-fast axis, among the OpenMP threads.
+
+Examples
+--------
+>>> a = np.array([[1, 2], [3, 4]])
+>>> b = np.array([[1, 0], [2, 1]])
+>>> ss.sum_product(a, b, axis=0)
+array([ 7,  4])
+
+MULTILINE STRING END */
+
+static char weighted_sum_doc[] =
+/* MULTILINE STRING BEGIN
+weighted_sum(a, w, axis=-1)
+
+Weighted sum of array elements along the specified axis. a.ndim must be
+greater than 1.
+
+Gives the result of (a * w).sum(axis), with `w` broadcast to the shape
+of `a`, without creating the temporary array a * w or a broadcast copy of
+the weights.
+
+Parameters
+----------
+a : array_like
+    Input array. If `a` is not an array, a conversion is attempted.
+w : array_like
+    Weights. Either a 1d array of length a.shape[axis], one weight for
+    each element along the reduced axis, or an array that broadcasts to
+    the shape of `a` with `axis` removed, one weight for each element of
+    the output; for example weights along the last kept axis. If both
+    interpretations fit then the first is used.
+axis : int, optional
+    Axis along which the sum is computed. The default (axis=-1) is to sum
+    along the last axis.
+
+Returns
+-------
+y : ndarray
+    An array with the same shape as `a`, with the specified axis removed.
+    If `a` and `w` have different dtypes then both are cast to their
+    common dtype first.
+
+Notes
+-----
+No error is raised on overflow.
+
+An input whose dtype is not the common dtype, or that is byte-swapped or
+not aligned, is first copied to a temporary array of its size. For `a`
+that is the allocation this function otherwise avoids, so pass `a` and
+`w` with the same dtype in native byte order to read `a` in place.
+
+Examples
+--------
+>>> a = np.array([[1.0, 2.0], [3.0, 4.0]])
+>>> ss.weighted_sum(a, [0.5, 0.25], axis=1)
+array([ 1. ,  2.5])
+
+MULTILINE STRING END */
+
 /* python wrapper -------------------------------------------------------- */
 
 static PyMethodDef
@@ -1617,6 +3649,33 @@ sums_methods[] = {
     {"sum10",   (PyCFunction)sum10,   VARKEY, sum_doc},
     {"sum11",   (PyCFunction)sum11,   VARKEY, sum_doc},
     {"sum12",   (PyCFunction)sum12,   VARKEY, sum_doc},
+    {"sum13",   (PyCFunction)sum13,   VARKEY, sum_doc},
+    {"p_sum13", (PyCFunction)p_sum13, VARKEY, sum_doc},
+    {"cumsum",   (PyCFunction)cumsum,   VARKEY, cumsum_doc},
+    {"p_cumsum", (PyCFunction)p_cumsum, VARKEY, cumsum_doc},
+    {"move_sum",    (PyCFunction)move_sum,    VARKEY, move_sum_doc},
+    {"p_move_sum",  (PyCFunction)p_move_sum,  VARKEY, move_sum_doc},
+    {"move_mean",   (PyCFunction)move_mean,   VARKEY, move_mean_doc},
+    {"p_move_mean", (PyCFunction)p_move_mean, VARKEY, move_mean_doc},
+    {"sum_product",    (PyCFunction)sum_product,    VARKEY,
+     sum_product_doc},
+    {"p_sum_product",  (PyCFunction)p_sum_product,  VARKEY,
+     sum_product_doc},
+    {"weighted_sum",   (PyCFunction)weighted_sum,   VARKEY,
+     weighted_sum_doc},
+    {"p_weighted_sum", (PyCFunction)p_weighted_sum, VARKEY,
+     weighted_sum_doc},
+    {"_numa_pin", (PyCFunction)numa_pin, METH_VARARGS, numa_pin_doc},
+    {"_numa_unpin", (PyCFunction)numa_unpin, METH_NOARGS, numa_unpin_doc},
+    {"_numa_set", (PyCFunction)numa_set, METH_VARARGS, numa_set_doc},
+    {"_numa_get", (PyCFunction)numa_get, METH_NOARGS, numa_get_doc},
+    {"_numa_touch", (PyCFunction)numa_touch, METH_VARARGS, numa_touch_doc},
+    {"_sum13_variants", (PyCFunction)sum13_variant_list, METH_NOARGS,
+     sum13_variants_doc},
+    {"_sum13_get", (PyCFunction)sum13_variant_get, METH_VARARGS,
+     sum13_get_doc},
+    {"_sum13_set", (PyCFunction)sum13_variant_set, METH_VARARGS,
+     sum13_set_doc},
     {NULL, NULL, 0, NULL}
 };
 
@@ -1652,5 +3711,6 @@ initsums(void)
     if (!intern_strings()) {
         return RETVAL;
     }
+    sum13_choice[0] = sum13_choice[1] = find_variant("u8_a4_c4");
     return RETVAL;
 }
@@ -1,6 +1,7 @@
 import os
 import re
 import ast
+import itertools
 
 
 def make_c_files():
@@ -28,7 +29,8 @@ def template(src_str):
 
 # repeat --------------------------------------------------------------------
 
-REPEAT_BEGIN = r'^/\*\s*repeat\s*=\s*'
+REPEAT_BEGIN = r'^/\*\s*repeat(\s+grid)?\s*=\s*'
+REPEAT_GRID = r'^/\*\s*repeat\s+grid\s*=\s*'
 REPEAT_END = r'^/\*\s*repeat end'
 COMMENT_END = r'.*\*\/.*'
 
@@ -50,6 +52,8 @@ def repeat_templating(lines):
 def expand_functions_repeat(lines):
     idx = first_occurence(COMMENT_END, lines)
     repeat_dict = repeat_info(lines[:idx + 1])
+    if re.match(REPEAT_GRID, lines[0]):
+        repeat_dict = repeat_grid(repeat_dict)
     lines = lines[idx + 1:]
     func_str = '\n'.join(lines)
     func_list = expand_repeat(func_str, repeat_dict)
@@ -63,6 +67,16 @@ def repeat_info(lines):
     return repeat_dict
 
 
+def repeat_grid(repeat_dict):
+    "Cartesian product of the repeat lists; keys are expanded in sorted order"
+    keys = sorted(repeat_dict)
+    grid = list(itertools.product(*[repeat_dict[key] for key in keys]))
+    grid_dict = {}
+    for i, key in enumerate(keys):
+        grid_dict[key] = [values[i] for values in grid]
+    return grid_dict
+
+
 def expand_repeat(func_str, repeat_dict):
     nrepeats = [len(repeat_dict[key]) for key in repeat_dict]
     if len(set(nrepeats)) != 1:
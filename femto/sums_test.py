@@ -12,10 +12,52 @@ DTYPES = [np.float64, np.float32, np.int64, np.int32]
 
 def test_sums():
     "test sums functions"
-    for func in ss.get_functions():
+    for func in ss.get_functions(module_name='sums'):
         yield unit_maker, func, arrays
 
 
+def test_sum13_variants():
+    "test every unrolling and cutoff variant of sum13 and p_sum13"
+    for variant in ss.sums._sum13_variants():
+        yield variant_maker, ss.sum13, 0, variant[0]
+        yield variant_maker, ss.p_sum13, 1, variant[0]
+
+
+def test_byteswapped():
+    "test sums functions with non-native byte order"
+    for func in ss.get_functions(module_name='sums'):
+        yield unit_maker, func, byteswapped_arrays
+
+
+def test_unaligned():
+    "test sums functions with arrays that are not aligned"
+    for func in ss.get_functions(module_name='sums'):
+        yield unit_maker, func, unaligned_arrays
+
+
+def test_buffers():
+    "test sums functions with objects that support the buffer protocol"
+    for func in ss.get_functions(module_name='sums'):
+        for dtype in DTYPES + ['>f8', 'uint8']:
+            a = np.arange(12).reshape(3, 4).astype(dtype)
+            readonly = a.copy()
+            readonly.flags.writeable = False
+            for b in (memoryview(a), memoryview(readonly), memoryview(a.T)):
+                for axis in range(-1, 2):
+                    desired = np.asarray(b).sum(axis=axis)
+                    assert_array_almost_equal(func(b, axis=axis), desired)
+
+
+def variant_maker(func, parallel, name):
+    "Test that variant `name` of ss.sum13 gives the same output as np.sum."
+    default = ss.sums._sum13_get(parallel)
+    ss.sums._sum13_set(name, parallel)
+    try:
+        unit_maker(func, arrays)
+    finally:
+        ss.sums._sum13_set(default, parallel)
+
+
 def unit_maker(func, arrays_func, decimal=5):
     "Test that ss.sumXX gives the same output as np.sum."
     fmt = '\nfunc %s | input %s (%s) | shape %s | axis %s | order %s\n'
@@ -46,6 +88,24 @@ def arrays():
             yield a.T
 
 
+def byteswapped_arrays():
+    "Arrays of `arrays` stored in non-native byte order"
+    for a in arrays():
+        yield a.astype(a.dtype.newbyteorder())
+
+
+def unaligned_arrays():
+    "Arrays of `arrays` that start one byte and one item into a buffer"
+    for a in arrays():
+        for offset in (1, a.itemsize):
+            buf = bytearray(a.nbytes + offset)
+            b = np.frombuffer(buf, a.dtype, a.size, offset).reshape(a.shape)
+            b[...] = a
+            yield b
+            if a.ndim > 1:
+                yield b.T
+
+
 def get_array_number(number):
     for i, a in enumerate(arrays()):
         if i == number:
@@ -87,6 +147,10 @@ def array_iter(dtypes=DTYPES):
         yield a[::2]
         yield a[:, ::2]
         yield a[::2][:, ::2]
+    for dtype in dtypes:
+        a = np.arange(60).reshape(3, 20).astype(dtype)
+        yield a[:, ::2]
+        yield a[:, ::-2]
     for dtype in dtypes:
         a = np.arange(60).reshape(3, 4, 5).astype(dtype)
         for start in range(2):
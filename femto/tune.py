@@ -0,0 +1,141 @@
+"Autotune the unrolling and cutoff variants of sum13 and p_sum13"
+
+import os
+import warnings
+
+import femto as ss
+
+__all__ = ['autotune']
+
+TUNED = ['sum13', 'p_sum13']
+
+
+def autotune(shapes=[(1000, 1000), (1000, 1000), (1000, 1000), (1000, 1000)],
+             dtypes=['float64', 'float64', 'float32', 'float32'],
+             axes=[0, 1, 0, 1],
+             filename=None,
+             mintime=0.05,
+             verbose=True):
+    """
+    Find the fastest variants of sum13 and p_sum13 on this computer.
+
+    Every variant (unroll factor, number of accumulators and scalar cutoff)
+    of sum13 and of p_sum13 is timed on the given arrays. The variant with
+    the highest score (harmonic mean of speeds relative to NumPy) is used
+    from then on and is saved so that it is used the next time femto is
+    imported, from the first call of sum13 or p_sum13.
+
+    Parameters
+    ----------
+    shapes : list, optional
+        A list of tuple shapes of input arrays to tune on.
+    dtypes : list, optional
+        A list of data type strings such as ['float64', 'int64'].
+    axes : list, optional
+        List of axes along which to sum.
+    filename : {str, None}, optional
+        Where to save the chosen variants. By default (None) the file named
+        by the FEMTO_TUNE environment variable or, if not set,
+        ~/.femto/tune.json is used.
+    mintime : float, optional
+        Minimum time in seconds to spend timing each variant on each array.
+    verbose : bool, optional
+        Whether to print the score of each variant.
+
+    Returns
+    -------
+    config : dict
+        Name of the chosen variant keyed by function name.
+
+    Notes
+    -----
+    Only sum13 and p_sum13 are tuned. The other sum functions keep their
+    hard coded unroll factors, accumulator counts and cutoffs. The grid
+    varies the number of scalar accumulators, not the SIMD width, which is
+    left to the compiler.
+
+    """
+    from femto.benchmark import autotimeit
+
+    if len(shapes) != len(axes):
+        raise ValueError("`shapes` and `axes` must have the same length")
+    if len(dtypes) != len(axes):
+        raise ValueError("`dtypes` and `axes` must have the same length")
+
+    template = """
+    from femto.benchmark import getarray
+    from femto import %s as func
+    a = getarray(%s, '%s')
+    axis = %s"""
+
+    config = {}
+    for parallel, func in enumerate(TUNED):
+        setups = []
+        for shape, dtype, axis in zip(shapes, dtypes, axes):
+            s = template % (func, str(shape), dtype, str(axis))
+            setups.append('\n'.join([line.strip() for line in s.split('\n')]))
+        t_numpy = [autotimeit("a.sum(axis)", setup, mintime=mintime)
+                   for setup in setups]
+        best_score = -1
+        for variant in ss.sums._sum13_variants():
+            name = variant[0]
+            ss.sums._sum13_set(name, parallel)
+            speed = []
+            for setup, t in zip(setups, t_numpy):
+                speed.append(t / autotimeit("func(a, axis)", setup,
+                                            mintime=mintime))
+            score = len(speed) / sum([1.0/s for s in speed])
+            if verbose:
+                print("%-8s %-12s %7.2f" % (func, name, score))
+            if score > best_score:
+                best_score = score
+                config[func] = name
+        ss.sums._sum13_set(config[func], parallel)
+        if verbose:
+            print("%-8s uses %s" % (func, config[func]))
+
+    save_config(config, filename)
+    return config
+
+
+def config_path():
+    "Path of the tuning configuration file"
+    filename = os.environ.get('FEMTO_TUNE')
+    if filename is None:
+        filename = os.path.join(os.path.expanduser('~'), '.femto',
+                                'tune.json')
+    return filename
+
+
+def save_config(config, filename=None):
+    "Save variant names keyed by function name"
+    if filename is None:
+        filename = config_path()
+    import json
+    dirname = os.path.dirname(filename)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    with open(filename, 'w') as f:
+        json.dump(config, f, indent=4, sort_keys=True)
+
+
+def load_config(filename=None):
+    "Use the variants saved by autotune; returns the config (empty if none)"
+    if filename is None:
+        filename = config_path()
+    if not os.path.exists(filename):
+        return {}
+    # json is only imported, on the first call of sum13, if there is a config
+    import json
+    with open(filename, 'r') as f:
+        config = json.load(f)
+    names = [variant[0] for variant in ss.sums._sum13_variants()]
+    for parallel, func in enumerate(TUNED):
+        if func not in config:
+            continue
+        if config[func] in names:
+            ss.sums._sum13_set(config[func], parallel)
+        else:
+            warnings.warn("%s variant `%s` in %s no longer exists; rerun "
+                          "femto.autotune()" % (func, config[func], filename))
+    return config
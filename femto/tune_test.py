@@ -0,0 +1,50 @@
+"Test autotuning of sum13 and p_sum13."
+
+import os
+import json
+import shutil
+import tempfile
+
+from numpy.testing import assert_equal
+
+import femto as ss
+from femto.tune import load_config
+
+
+def test_autotune():
+    "test ss.autotune saves and uses the chosen variants"
+    tmpdir = tempfile.mkdtemp()
+    defaults = [ss.sums._sum13_get(0), ss.sums._sum13_get(1)]
+    try:
+        filename = os.path.join(tmpdir, 'tune.json')
+        config = ss.autotune(shapes=[(10, 10)], dtypes=['float64'],
+                             axes=[0], filename=filename, mintime=1e-4,
+                             verbose=False)
+        assert_equal(config['sum13'], ss.sums._sum13_get(0))
+        assert_equal(config['p_sum13'], ss.sums._sum13_get(1))
+        with open(filename) as f:
+            assert_equal(json.load(f), config)
+    finally:
+        ss.sums._sum13_set(defaults[0], 0)
+        ss.sums._sum13_set(defaults[1], 1)
+        shutil.rmtree(tmpdir)
+
+
+def test_load_config():
+    "test load_config applies known variants and skips missing files"
+    tmpdir = tempfile.mkdtemp()
+    defaults = [ss.sums._sum13_get(0), ss.sums._sum13_get(1)]
+    try:
+        filename = os.path.join(tmpdir, 'tune.json')
+        assert_equal(load_config(filename), {})
+        names = [v[0] for v in ss.sums._sum13_variants()]
+        config = {'sum13': names[0], 'p_sum13': names[-1]}
+        with open(filename, 'w') as f:
+            json.dump(config, f)
+        assert_equal(load_config(filename), config)
+        assert_equal(ss.sums._sum13_get(0), names[0])
+        assert_equal(ss.sums._sum13_get(1), names[-1])
+    finally:
+        ss.sums._sum13_set(defaults[0], 0)
+        ss.sums._sum13_set(defaults[1], 1)
+        shutil.rmtree(tmpdir)
@@ -1,20 +1,25 @@
+from collections import OrderedDict
+
 import femto as ss
 
 
-def get_functions(as_string=False):
+def get_functions(as_string=False, module_name='all'):
     "Returns a list of functions, optionally as string function names"
     funcs = []
     funcs_in_dict = func_dict()
-    for key in funcs_in_dict:
-        for func in funcs_in_dict[key]:
-            funcs.append(func)
+    if module_name == 'all':
+        for key in funcs_in_dict:
+            for func in funcs_in_dict[key]:
+                funcs.append(func)
+    else:
+        funcs = list(funcs_in_dict[module_name])
     if as_string:
         funcs = [f.__name__ for f in funcs]
     return funcs
 
 
 def func_dict():
-    d = {}
+    d = OrderedDict()
     d['sums'] = [
                  ss.sum00,
                  ss.sum01,
@@ -24,9 +29,27 @@ def func_dict():
                  ss.sum10,
                  ss.sum11,
                  ss.sum12,
+                 ss.sum13,
                  ss.p_sum01,
                  ss.p_sum02,
                  ss.p_sum03,
                  ss.p_sum04,
+                 ss.p_sum13,
                  ]
+    d['cumsums'] = [
+                    ss.cumsum,
+                    ss.p_cumsum,
+                    ]
+    d['moves'] = [
+                  ss.move_sum,
+                  ss.move_mean,
+                  ss.p_move_sum,
+                  ss.p_move_mean,
+                  ]
+    d['products'] = [
+                     ss.sum_product,
+                     ss.weighted_sum,
+                     ss.p_sum_product,
+                     ss.p_weighted_sum,
+                     ]
     return d
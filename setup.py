@@ -63,6 +63,8 @@ CLASSIFIERS = [
     "Programming Language :: C",
     "Programming Language :: Python",
     "Programming Language :: Python :: 3",
+    "Programming Language :: Python :: 3 :: Only",
+    "Programming Language :: Python :: 3.8",
     "Topic :: Scientific/Engineering"]
 
 
@@ -79,7 +81,8 @@ metadata = dict(name='femto',
                 packages=find_packages(),
                 package_data={'femto': ['LICENSE']},
                 requires=['numpy'],
-                install_requires=['numpy'],
+                install_requires=['numpy>=1.17'],
+                python_requires='>=3.8',
                 cmdclass={'build_ext': build_ext},
                 setup_requires=['numpy'])
 